@@ -17,7 +17,8 @@ default_config="/etc/ConsolePi/ConsolePi.conf"      # TODO Double check, should
 wpa_supplicant_file="/etc/wpa_supplicant/wpa_supplicant.conf"
 tmp_log="/tmp/consolepi_install.log"
 final_log="/var/log/ConsolePi/install.log"
-cloud_cache="/etc/ConsolePi/cloud.json"
+cloud_cache="/etc/ConsolePi/cloud.json" # legacy, imported into cloud_db when the db is created
+cloud_db="/etc/ConsolePi/cloud.db"
 override_dir="/etc/ConsolePi/overrides" # TODO NO TRAILING / make others that way
 py3ver=$(python3 -V | cut -d. -f2)
 yml_script="/etc/ConsolePi/src/yaml2bash.py"
@@ -332,19 +332,23 @@ pre_git_prep() {
         unset process
     fi
 
-    # -- Verify cloud cache is owned by consolepi group
-    if [ -f $cloud_cache ]; then
-        process="ConsolePi-Upgrade-Prep (check cache owned by consolepi group)"
-        group=$(stat -c '%G' $cloud_cache)
-        if [ ! $group == "consolepi" ]; then
-            sudo chgrp consolepi $cloud_cache 2>> $log_file &&
-                logit "Successfully Changed cloud cache group" ||
-                logit "Failed to Change cloud cache group" "WARNING"
-        else
-            logit "Cloud Cache ownership already OK"
+    # -- Verify cloud cache (legacy json and sqlite db + WAL/SHM) is owned by consolepi group with group write
+    for _cache_file in $cloud_cache $cloud_db ${cloud_db}-wal ${cloud_db}-shm; do
+        if [ -f $_cache_file ]; then
+            process="ConsolePi-Upgrade-Prep (check cache owned by consolepi group)"
+            group=$(stat -c '%G' $_cache_file)
+            if [ ! $group == "consolepi" ]; then
+                sudo chgrp consolepi $_cache_file 2>> $log_file &&
+                    logit "Successfully Changed cloud cache group (${_cache_file##*/})" ||
+                    logit "Failed to Change cloud cache group (${_cache_file##*/})" "WARNING"
+            else
+                logit "Cloud Cache ownership already OK (${_cache_file##*/})"
+            fi
+            sudo chmod g+rw $_cache_file 2>> $log_file ||
+                logit "Failed to set group rw on cloud cache (${_cache_file##*/})" "WARNING"
+            unset process
         fi
-        unset process
-    fi
+    done
 
     # -- verify Group owndership and permissions of /etc/ConsolePi and .git dir
     if [ -d $consolepi_dir ]; then
@@ -13,26 +13,62 @@ to ensure the remote is reachable and that the data is current.
 '''
 import sys
 sys.path.insert(0, '/etc/ConsolePi/src/pypkg')
-from consolepi import config, log  # NoQA
-from consolepi.consolepi import ConsolePi  # NoQA
+from consolepi import config, log, utils  # NoQA
+from consolepi.local import Local  # NoQA
+from consolepi.exec import ConsolePiExec  # NoQA
+from consolepi.inventory import AdapterInventory  # NoQA
+from consolepi.reachability import Scoreboard  # NoQA
+from consolepi import metrics  # NoQA
 from fastapi import FastAPI  # NoQA
 from pydantic import BaseModel  # NoQA
-from time import time  # NoQA
+from time import time, sleep, perf_counter  # NoQA
 from starlette.requests import Request  # NoQA
+from starlette.responses import JSONResponse, Response, StreamingResponse  # NoQA
+from starlette.middleware.gzip import GZipMiddleware  # NoQA
+import asyncio  # NoQA
+import copy  # NoQA
+import hashlib  # NoQA
+import threading  # NoQA
+import json  # NoQA
 import uvicorn  # NoQA
 
+# -- optional binary encodings, used when the client requests them via Accept header --
+try:
+    import msgpack  # NoQA
+except ImportError:
+    msgpack = None
+try:
+    import cbor2  # NoQA
+except ImportError:
+    cbor2 = None
 
-cpi = ConsolePi()
-cpiexec = cpi.cpiexec
-local = cpi.local
-if config.power:
-    if not cpiexec.wait_for_threads():
-        OUTLETS = cpi.pwr.data if cpi.pwr.data else None
+
+# fast start (api_fast_start override) builds only Local so the api is serving within a second of start, power is
+# initialized in the background (start_power).  Otherwise (default) the full ConsolePi (verifies remotes, waits on power)
+# is built first.
+cpi = None
+OUTLETS = None
+POWER_TIMEOUT = False  # power init threads were still running after the startup wait
+if config.api_fast_start:
+    local = Local()
 else:
-    OUTLETS = None
+    from consolepi.consolepi import ConsolePi  # NoQA
+    cpi = ConsolePi()
+    local = cpi.local
+    if config.power:
+        POWER_TIMEOUT = bool(cpi.cpiexec.wait_for_threads())
+        if not POWER_TIMEOUT:
+            OUTLETS = cpi.pwr.data if cpi.pwr.data else None
 user = local.user
+KEEP_ALIVE = 75  # seconds idle keep-alive connections are held open
+GZIP_MIN_SIZE = 500  # responses smaller than this (bytes) are not compressed
+GZIP_EXCLUDE = ['/api/v1.0/events']  # streamed responses, the compressor would buffer events until it flushes
+EVENT_KEEPALIVE = 15  # seconds between keepalive comments on idle event streams
+EVENT_QUEUE_SIZE = 100  # events buffered per subscriber, slow subscribers are dropped (they re-sync on reconnect)
+INTERFACE_TTL = 20  # seconds interface data is trusted before it is refreshed (details/snapshot)
+SNAPSHOT_SECTIONS = ['adapters', 'interfaces', 'outlets']
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4'  # prometheus text exposition format (charset is added)
 last_update = int(time())
-udev_last_update = int(time())
 
 
 # class Adapters(BaseModel):
@@ -87,31 +123,440 @@ udev_last_update = int(time())
 #         }
 
 
+class GZipMiddlewareNoStream(GZipMiddleware):
+    '''GZip responses except for routes in GZIP_EXCLUDE (event stream), which must be sent as they are written.'''
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] in GZIP_EXCLUDE:
+            await self.app(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+
 app = FastAPI(title='ConsolePi.API',
               docs_url='/api/docs',
               redoc_url="/api/redoc",
               openapi_url='/api/openapi/openapi.json'
               )
+app.add_middleware(GZipMiddlewareNoStream, minimum_size=GZIP_MIN_SIZE)
+
+# -- metrics, exposed in prometheus text format via /api/v1.0/metrics --
+REQUESTS = metrics.counter('consolepi_api_requests_total', 'API requests', ['route', 'method', 'status'])
+REQUEST_TIME = metrics.histogram('consolepi_api_request_duration_seconds', 'API request latency', ['route'])
+ADAPTER_CACHE = metrics.counter(
+    'consolepi_api_adapter_cache_total', 'Adapter requests served from memory (hit) or requiring a rebuild (miss)',
+    ['result']
+)
+REMOTE_LATENCY = metrics.gauge(
+    'consolepi_remote_latency_ewma_seconds', 'Moving average API latency to remote ConsolePis (reachability file)',
+    ['remote', 'ip']
+)
+REMOTE_FAILS = metrics.gauge(
+    'consolepi_remote_consecutive_failures', 'Consecutive failed API requests to remote ConsolePis (reachability file)',
+    ['remote', 'ip']
+)
+
+
+@app.middleware('http')
+async def record_metrics(request: Request, call_next):
+    start = perf_counter()
+    response = await call_next(request)
+    # label with the route template (/api/v1.0/adapters/udev/{adapter}) not the path, unmatched paths are grouped
+    route = getattr(request.scope.get('route'), 'path', 'unmatched')
+    REQUEST_TIME.observe(perf_counter() - start, route=route)
+    REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    return response
 
 
 def log_request(request: Request, route: str):
     log.info('[NEW API RQST IN] {} Requesting -- {} -- Data via API'.format(request.client.host, route))
 
+
+def get_etag(adapters: dict) -> str:
+    '''Return content hash of adapter data for use as ETag.'''
+    return f'"{utils.content_hash(adapters)}"'
+
+
+def parse_fields(fields: str) -> list:
+    '''Return list of fields from comma seperated fields query param (None if not provided).'''
+    return None if not fields else [f.strip() for f in fields.split(',') if f.strip()] or None
+
+
+def project(data: dict, fields: list) -> dict:
+    '''Return data with only the requested fields.
+
+    params:
+        data(dict): dict to project
+        fields(list): keys to keep, nested keys are specified with dotted path (i.e. config.port)
+    '''
+    out = {}
+    for f in fields:
+        k, _, sub = f.partition('.')
+        if k not in data:
+            continue
+        if not sub:
+            out[k] = data[k]
+        elif isinstance(data[k], dict):
+            out[k] = {**out.get(k, {}), **project(data[k], [sub])}
+    return out
+
+
+def fields_etag(etag: str, fields: list) -> str:
+    '''Return ETag for a projection (fields) of the data represented by etag.'''
+    return etag if not fields else f'{etag[:-1]};fields={",".join(sorted(fields))}"'
+
+
+def encode(request: Request, content, status_code: int = 200, headers: dict = None) -> Response:
+    '''Return Response encoded as requested by the client Accept header (msgpack, cbor, default json).
+
+    Binary encodings are only used if the module is installed, otherwise json is returned.
+    '''
+    accept = request.headers.get('accept', '')
+    headers = {**(headers or {}), 'Vary': 'Accept, Accept-Encoding'}
+    if msgpack and ('application/msgpack' in accept or 'application/x-msgpack' in accept):
+        return Response(msgpack.packb(content), status_code=status_code, headers=headers, media_type='application/msgpack')
+    if cbor2 and 'application/cbor' in accept:
+        return Response(cbor2.dumps(content), status_code=status_code, headers=headers, media_type='application/cbor')
+    return JSONResponse(content, status_code=status_code, headers=headers)
+
+
+class AdapterGenerations:
+    '''Track changes to local adapter data by generation to support delta requests (?since=<generation>).
+
+    The generation is seeded from the start time (ms) so generations from a previous run of the API
+    are never mistaken for current ones, and is incremented each time the adapter data changes.
+    '''
+
+    def __init__(self, adapters: dict, max_history: int = 100, on_change=None):
+        self.on_change = on_change  # called with (generation, added, changed, removed) when adapters change
+        self.generation = int(time() * 1000)
+        self.max_history = max_history
+        self.hashes = {a: utils.content_hash(adapters[a]) for a in adapters}
+        self.etag = get_etag(adapters)
+        self.history = []  # [(generation, changed adapters, removed adapters), ...]
+
+    def update(self, adapters: dict) -> int:
+        '''Compare adapters with previous data, incrementing generation if anything changed.'''
+        hashes = {a: utils.content_hash(adapters[a]) for a in adapters}
+        changed = {a for a in hashes if hashes[a] != self.hashes.get(a)}
+        removed = {a for a in self.hashes if a not in hashes}
+        if changed or removed:
+            self.generation += 1
+            self.history = [*self.history, (self.generation, changed, removed)][-self.max_history:]
+            log.info(f'[API ADAPTERS] generation {self.generation}: changed {sorted(changed)} removed {sorted(removed)}')
+            self.etag = get_etag(adapters)
+            if self.on_change:
+                added = {a for a in changed if a not in self.hashes}
+                self.on_change(self.generation, added, changed - added, removed)
+        self.hashes = hashes
+        return self.generation
+
+    def delta(self, since: int, adapters: dict):
+        '''Return adapters added/changed and removed since generation.
+
+        returns:
+            dict: response with only the changed adapters, or None if since is not within the
+                  tracked history (caller should send full adapter data)
+        '''
+        oldest = self.history[0][0] - 1 if self.history else self.generation
+        if since < oldest or since > self.generation:
+            return None
+
+        changed, removed = set(), set()
+        for gen, _changed, _removed in self.history:
+            if gen > since:
+                changed = (changed | _changed) - _removed
+                removed = (removed | _removed) - _changed
+
+        return {
+            'adapters': {a: adapters[a] for a in changed if a in adapters},
+            'removed': sorted(removed),
+            'generation': self.generation,
+            'delta': True
+        }
+
+
+class SectionState:
+    '''Track generation and last refresh time for a section of local data (interfaces, outlets).
+
+    generation is seeded from the start time (ms) and incremented each time the data changes.
+    '''
+
+    def __init__(self, data):
+        self.generation = int(time() * 1000)
+        self.updated = time()
+        self.hash = utils.content_hash(data)
+
+    def update(self, data) -> bool:
+        '''Record a refresh of the data, returns True if the data changed.'''
+        self.updated = time()
+        _hash = utils.content_hash(data)
+        if _hash == self.hash:
+            return False
+        self.hash = _hash
+        self.generation += 1
+        return True
+
+
+def sanitize_outlets(outlets: dict) -> dict:
+    '''Return copy of outlet data with credentials removed.'''
+    if not outlets:
+        return outlets
+    return {
+        k: v if k not in ['defined', 'failures'] or not isinstance(v, dict) else
+        {o: {_k: _v for _k, _v in v[o].items() if _k not in ['username', 'password']} for o in v}
+        for k, v in outlets.items()
+    }
+
+
+def refresh_interfaces(max_age: int = INTERFACE_TTL):
+    '''Refresh local interface data if it is older than max_age (seconds).'''
+    if time() - interface_state.updated >= max_age:
+        local.interfaces = local.get_if_info()
+        if interface_state.update(local.interfaces):
+            log.info(f'[API INTERFACES] generation {interface_state.generation}: interfaces changed')
+
+
+class EventBus:
+    '''Fan out change events to event stream subscribers.
+
+    publish is thread safe (adapter rebuilds occur in worker threads), each subscriber has a queue
+    on the event loop it subscribed from.
+    '''
+
+    def __init__(self):
+        self.subscribers = {}  # queue: loop
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.pop(queue, None)
+
+    def publish(self, event: str, data: dict, event_id: int = None):
+        for queue, loop in list(self.subscribers.items()):
+            loop.call_soon_threadsafe(self._put, queue, (event, data, event_id))
+
+    def _put(self, queue: asyncio.Queue, item: tuple):
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            log.warning('[API EVENTS] subscriber is not keeping up, dropping subscriber')
+            self.unsubscribe(queue)
+            # the queue is full, discard what is queued so the close sentinel (None) always fits
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)  # get() will not block forever, None closes the stream
+
+
+def publish_adapter_changes(generation: int, added: set, changed: set, removed: set):
+    '''Publish adapter add/change/remove events (event id is the adapter generation).'''
+    adapters = local.adapters
+    for action, names in [('add', added), ('change', changed), ('remove', removed)]:
+        for a in sorted(names):
+            data = {'adapter': a, 'action': action, 'generation': generation}
+            if action != 'remove':
+                data['data'] = adapters.get(a)
+            events.publish('adapter', data, event_id=generation)
+
+
+def publish_outlet_changes(outlets: dict, previous: dict = None):
+    '''Publish outlet state change events for any outlets (defined outlets / dli ports) that differ from previous.'''
+    outlets, previous = outlets or {}, previous or {}
+    for section in ['defined', 'dli_power']:
+        _this, _prev = outlets.get(section) or {}, previous.get(section) or {}
+        for o in _this:
+            if _this[o] != _prev.get(o):
+                events.publish('outlet', {'section': section, 'outlet': o, 'data': _this[o]})
+        for o in _prev:
+            if o not in _this:
+                events.publish('outlet', {'section': section, 'outlet': o, 'data': None})
+
+
+class OutletPoller:
+    '''Refresh outlet state in the background, requests are served the sanitized (no credentials) copy in data.
+
+    params:
+        pwr: Outlets object
+        outlets: outlet data collected on startup
+        interval: seconds between refreshes
+    '''
+
+    def __init__(self, pwr, outlets: dict, interval: int):
+        self.pwr = pwr
+        self.interval = interval
+        self.data = sanitize_outlets(copy.deepcopy(outlets))
+
+    def start(self):
+        threading.Thread(target=self._poll, name='outlet_poller', daemon=True).start()
+
+    def update(self, outlets: dict):
+        data = sanitize_outlets(copy.deepcopy(outlets))
+        publish_outlet_changes(data, self.data)
+        self.data = data
+        if outlet_state.update(data):
+            log.info(f'[API OUTLETS] generation {outlet_state.generation}: outlet state changed')
+
+    def _poll(self):
+        while True:
+            sleep(self.interval)
+            _start = time()
+            try:
+                self.update(self.pwr.pwr_get_outlets())
+            except Exception as e:
+                log.error(f'[API OUTLETS] Outlet refresh failed\n\t{e}')
+                continue
+
+            log.debug(f'[API OUTLETS] Outlets refreshed, elapsed time: {time() - _start:.2f}')
+
+
+def start_power():
+    '''Initialize power (fast start), outlets are available via the api once the init threads complete.'''
+    from consolepi.power import Outlets  # NoQA
+    _start = time()
+    try:
+        pwr = Outlets()
+        timeout = ConsolePiExec(config, pwr, local, None).wait_for_threads()
+    except Exception as e:
+        log.error(f'[API OUTLETS] Power init failed\n\t{e}')
+        return
+
+    if timeout:
+        log.warning('[API OUTLETS] Timeout waiting for power init, outlets available after the next background refresh')
+        outlet_poller.pwr = pwr
+        outlet_poller.start()
+    elif pwr.data:
+        outlet_poller.pwr = pwr
+        outlet_poller.update(pwr.data)
+        outlet_poller.start()
+        log.info(f'[API OUTLETS] Power init complete, elapsed time: {time() - _start:.2f}')
+
+
+events = EventBus()
+adapter_gens = AdapterGenerations(local.adapters, on_change=publish_adapter_changes)
+interface_state = SectionState(local.interfaces)
+outlet_poller = OutletPoller(None if cpi is None else cpi.pwr, OUTLETS, config.api_outlet_poll)
+outlet_state = SectionState(outlet_poller.data)
+if OUTLETS:
+    outlet_poller.start()
+elif POWER_TIMEOUT:
+    log.warning('[API OUTLETS] Timeout waiting for power init, outlets available after the next background refresh')
+    outlet_poller.start()
+elif config.power and cpi is None:
+    threading.Thread(target=start_power, name='api_power_start', daemon=True).start()
+
+# keep local.adapters current based on udev / ser2net change events, falls back to refreshing on request if not available
+inventory = AdapterInventory(local, on_change=adapter_gens.update)
+if not inventory.start():
+    log.warning('[API] Adapter inventory not live, adapters will be refreshed on request (max every 20 seconds)')
+# interface data is updated on rtnetlink notifications, if not available it's refreshed on request (INTERFACE_TTL)
+local.start_interface_tracker(on_change=lambda interfaces: refresh_interfaces(max_age=0))
+
+
 #  -- Haven't yet cracked the code on properly updating swagger-ui with examples and schema --
 # @app.get('/api/v1.0/adapters', responses={200: {'model': Adapters}})
 @app.get('/api/v1.0/adapters')
-async def adapters(request: Request, refresh: bool = False):
-    global last_update
-    time_upd = True if int(time()) - last_update > 20 else False
+async def adapters(request: Request, refresh: bool = False, since: int = None, fields: str = None):
+    time_upd = True if not inventory.live and time() - inventory.last_update > 20 else False
     log_request(request, f'adapters Update based on Time {time_upd}, Update based on query param {refresh}')
-    # if data has been refreshed in the last 20 seconds trust it is valid
-    # prevents multiple simul calls to get_adapters after mdns_refresh and
+    ADAPTER_CACHE.inc(result='miss' if refresh or time_upd else 'hit')
+    # live inventory is kept current by udev/ser2net events.  Otherwise if data has been refreshed in the
+    # last 20 seconds trust it is valid, prevents multiple simul calls to get_adapters after mdns_refresh and
     # subsequent API calls from all other ConsolePi on the network
-    if refresh or int(time()) - last_update > 20:
-        config.ser2net_conf = config.get_ser2net()
-        local.adapters = local.build_adapter_dict(refresh=True)
-        last_update = int(time())
-    return {'adapters': local.adapters}
+    # refresh is sent by remotes after a rename, rebuild now rather than wait for the ser2net event
+    # rebuild runs in a worker thread, concurrent requests share a single rebuild
+    if refresh or time_upd:
+        await inventory.refresh()
+
+    # Remotes send the ETag from their last request, respond 304 with no body if adapters have not changed
+    fields = parse_fields(fields)  # i.e. ?fields=config to return only the config for each adapter
+    etag = fields_etag(adapter_gens.etag, fields)  # computed when adapters change rather than on every request
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+
+    # Remotes send the generation from their last request, respond with only what changed since
+    delta = None if since is None else adapter_gens.delta(since, local.adapters)
+    if delta is None:
+        delta = {'adapters': local.adapters, 'generation': adapter_gens.generation}
+    if fields:
+        delta['adapters'] = {a: project(v, fields) for a, v in delta['adapters'].items()}
+    return encode(request, delta, headers={'ETag': etag})
+
+
+@app.get('/api/v1.0/events')
+async def event_stream(request: Request):
+    '''Server-Sent Events stream of adapter (add, change, remove) and outlet state changes.
+
+    The first event (hello) includes the current adapter generation.  Clients that reconnect can
+    use /adapters?since=<generation> to catch up on anything missed.
+    '''
+    log_request(request, 'events (stream)')
+    queue = events.subscribe()
+
+    def sse(event: str, data: dict, event_id: int = None) -> str:
+        _id = '' if event_id is None else f'id: {event_id}\n'
+        return f'{_id}event: {event}\ndata: {json.dumps(data)}\n\n'
+
+    async def stream():
+        try:
+            yield sse('hello', {'hostname': local.hostname, 'generation': adapter_gens.generation},
+                      event_id=adapter_gens.generation)
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), EVENT_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ': keepalive\n\n'
+                    continue
+                if item is None:
+                    break
+                yield sse(*item)
+        finally:
+            events.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.get('/api/v1.0/snapshot')
+async def snapshot(request: Request, refresh: bool = False, since: int = None, sections: str = None):
+    '''Return adapters, interfaces and outlets in a single response.
+
+    Each section includes data, generation and updated (epoch time the data was last refreshed).
+    since (adapter generation) and If-None-Match (ETag) work as they do for /adapters.
+    sections can be used to limit the response i.e. ?sections=adapters,interfaces
+    '''
+    time_upd = True if not inventory.live and time() - inventory.last_update > 20 else False
+    log_request(request, f'snapshot Update based on Time {time_upd}, Update based on query param {refresh}')
+    ADAPTER_CACHE.inc(result='miss' if refresh or time_upd else 'hit')
+    if refresh or time_upd:
+        await inventory.refresh()
+    await asyncio.get_running_loop().run_in_executor(None, refresh_interfaces)
+
+    sections = [s for s in parse_fields(sections) or SNAPSHOT_SECTIONS if s in SNAPSHOT_SECTIONS]
+    _hashes = {'adapters': adapter_gens.etag, 'interfaces': interface_state.hash, 'outlets': outlet_state.hash}
+    etag = f'"{hashlib.sha1("".join(f"{s}:{_hashes[s]}" for s in sections).encode("UTF-8")).hexdigest()}"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+
+    ret = {'hostname': local.hostname}
+    if 'adapters' in sections:
+        delta = None if since is None else adapter_gens.delta(since, local.adapters)
+        ret['adapters'] = {'data': local.adapters, 'generation': adapter_gens.generation,
+                           'updated': inventory.last_update}
+        if delta is not None:
+            ret['adapters'] = {**ret['adapters'], 'data': delta['adapters'], 'removed': delta['removed'], 'delta': True}
+    if 'interfaces' in sections:
+        ret['interfaces'] = {'data': local.interfaces, 'generation': interface_state.generation,
+                             'updated': interface_state.updated}
+    if 'outlets' in sections:
+        ret['outlets'] = {'data': outlet_poller.data, 'generation': outlet_state.generation,
+                          'updated': outlet_state.updated}
+
+    return encode(request, ret, headers={'ETag': etag})
 
 
 @app.get('/api/v1.0/adapters/udev/{adapter}')
@@ -123,39 +568,60 @@ async def udev(request: Request, adapter: str = None):
 @app.get('/api/v1.0/remotes')
 def remotes(request: Request):
     log_request(request, 'remotes')
-    return {'remotes': config.get_remotes_from_file()}
+    return {'remotes': config.cache_watcher.snapshot()[1]}
 
 
 @app.get('/api/v1.0/interfaces')
 def get_ifaces(request: Request):
     log_request(request, 'ifaces')
-    local.interfaces = local.get_if_info()
+    refresh_interfaces(max_age=0)
     return {'interfaces': local.interfaces}
 
-# removing due to fastapi issue #894, outlets method was not being used for anything currently so disabling for now
-# @app.get('/api/v1.0/outlets')
-# def get_outlets(request: Request, outlets=OUTLETS):
-#     log_request(request, 'outlets')
-#     # -- Collect Outlet Details remove sensitive data --
-#     if outlets:
-#         outlets = cpi.pwr.pwr_get_outlets()
-#         cpiexec.wait_for_threads()
-#         if outlets and 'defined' in outlets:
-#             outlets['defined'] = {p: {k: v for k, v in outlets['defined'][p].items()
-#                                   if k not in ['username', 'password']} for p in outlets['defined']}
 
-#     return outlets
+@app.get('/api/v1.0/outlets')
+def get_outlets(request: Request):
+    log_request(request, 'outlets')
+    # -- served from the background poller, credentials are removed --
+    return {'outlets': outlet_poller.data, 'updated': outlet_state.updated, 'generation': outlet_state.generation}
 
 
 @app.get('/api/v1.0/details')
-def get_details(request: Request):
+async def get_details(request: Request, fields: str = None):
     log_request(request, 'details')
     global last_update
     if int(time()) - last_update > 20:
-        local.data = local.build_local_dict(refresh=True)
+        if not inventory.live:
+            await inventory.refresh()  # shares a single rebuild with concurrent adapter/snapshot requests
+        await asyncio.get_running_loop().run_in_executor(None, refresh_interfaces, 0)
+        local.data = local.build_local_dict()
         last_update = int(time())
-    return local.data
+
+    fields = parse_fields(fields)  # i.e. ?fields=adapters,interfaces
+    etag = fields_etag(f'"{local.hash}"', fields)  # local content hash, changes only when local data changes
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+    return encode(request, local.data if not fields else {h: project(v, fields) for h, v in local.data.items()},
+                  headers={'ETag': etag})
+
+
+@app.get('/api/v1.0/metrics')
+def get_metrics(request: Request):
+    '''Prometheus text format metrics for this api process.
+
+    Latency to remote ConsolePis is verified by other processes (mdns_browser, menu), it's exposed here
+    from the reachability scores they persist.
+    '''
+    scores = Scoreboard(config.static.get('REACHABILITY_FILE', '/etc/ConsolePi/reachability.json')).data
+    REMOTE_LATENCY.clear()
+    REMOTE_FAILS.clear()
+    for remote in scores:
+        for ip, score in scores[remote].items():
+            if 'ewma' in score:
+                REMOTE_LATENCY.set(round(score['ewma'], 4), remote=remote, ip=ip)
+            REMOTE_FAILS.set(score.get('fails', 0), remote=remote, ip=ip)
+    return Response(metrics.registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=5000, log_level="info")
+    # keep idle connections from other ConsolePis open so their pooled client can reuse them between refreshes
+    uvicorn.run(app, host="0.0.0.0", port=5000, log_level="info", timeout_keep_alive=KEEP_ALIVE)
@@ -59,7 +59,7 @@ if len(sys.argv) > 1:
                 if sys.argv[3] in remotes:
                     print('Removing ' + sys.argv[3] + ' from local cloud cache')
                     remotes.pop(sys.argv[3])
-                    cpi.remotes.update_local_cloud_file(remote_consoles=remotes, current_remotes=remotes)
+                    config.cloud_cache.delete(sys.argv[3])
                     print('Remotes remaining in local cache')
                     jprint(remotes)
                     print('{} Removed from local cache'.format(sys.argv[3]))
@@ -2,6 +2,7 @@
 
 import json
 import readline # NoQA - allows input to accept backspace
+import select
 import sys
 import re
 import threading
@@ -27,7 +28,8 @@ MAX_COLS = 5
 class ConsolePiMenu(Rename):
 
     def __init__(self, bypass_remotes=False):
-        self.cpi = ConsolePi(bypass_remotes=bypass_remotes)
+        # remotes are verified in the background so the menu can be displayed immediately using cached data
+        self.cpi = ConsolePi(bypass_remotes=bypass_remotes, bg_remotes=True)
         self.cpiexec = self.cpi.cpiexec
         self.baud = config.default_baud
         self.go = True
@@ -343,7 +345,7 @@ class ConsolePiMenu(Rename):
                     with Halo(text='Refreshing Outlets', spinner='dots'):
                         outlets = self.cpiexec.outlet_update(refresh=True, upd_linked=True)
 
-    def wait_for_input(self, prompt=" >> ", terminate=False, locs={}):
+    def wait_for_input(self, prompt=" >> ", terminate=False, locs={}, redraw=None):
         '''Get input from user.
 
         User Can Input One of the following for special handling:
@@ -360,6 +362,10 @@ class ConsolePiMenu(Rename):
             lower {bool} -- return lower case user input (default: {True})
             terminate {bool} -- terminates program if Ctrl+C/Ctrl+D (default: {False})
             locs {dict} -- locals from calling func for use in debug print func (default: {{}})
+            redraw {callable} -- if provided and it returns True while waiting for input (with nothing entered)
+                                 an empty str is returned so the menu is re-printed (default: {None}).
+                                 The terminal is in line mode, so text typed but not yet entered can't be seen,
+                                 it's lost from the screen when the menu is re-printed (still read on Enter).
 
         Returns:
             str -- If user input is not 'exit' (which exits the program) will return an
@@ -368,10 +374,23 @@ class ConsolePiMenu(Rename):
         '''
         menu = self.menu
 
+        def redraw_input(prompt):
+            '''input() that returns None if redraw() returns True before a line is entered.'''
+            print(prompt, end='', flush=True)
+            while not select.select([sys.stdin], [], [], 0.5)[0]:
+                if redraw():
+                    return None
+            ch = sys.stdin.readline()
+            if not ch:
+                raise EOFError
+            return ch.rstrip('\n')
+
         class choice():
             def __init__(self, clear=False):
+                ch = None
                 if not clear:
-                    ch = input(prompt)
+                    ch = input(prompt) if redraw is None or not sys.stdin.isatty() else redraw_input(prompt)
+                if ch is not None:
                     self.lower = ch.lower()
                     self.orig = ch
                 else:
@@ -785,6 +804,7 @@ class ConsolePiMenu(Rename):
         loc = cpi.local.adapters
         pwr = cpi.pwr
         remotes = cpi.remotes
+        _version = remotes.version  # captured before the menu is built, so updates made while it's printed trigger a redraw
         rem = cpi.remotes.data
         outer_body = []
         slines = []
@@ -838,7 +858,8 @@ class ConsolePiMenu(Rename):
                     menu_actions = {**menu_actions, **rem_menu_actions}
 
                 rem_outer_body.append(rem_mlines)
-                rem_slines.append('[Remote] {} @ {}'.format(host, rem[host]['rem_ip']))
+                rem_slines.append('[Remote] {} @ {}{}'.format(host, rem[host]['rem_ip'],
+                                                              ' (pending)' if host in remotes.pending else ''))
 
         # -- // COMPACT MODE \\ --
         if remotes.connected:
@@ -887,7 +908,12 @@ class ConsolePiMenu(Rename):
         menu.print_menu(outer_body, header='{{cyan}}Console{{red}}Pi{{norm}} {{cyan}}Serial Menu{{norm}}',
                         footer={'opts': foot_opts}, subs=slines, do_format=False)
 
-        choice_c = self.wait_for_input(locs=locals(), terminate=True)
+        # re-print the menu as background verification of remotes updates remote data
+        if remotes.revalidate_thread is not None and (remotes.revalidate_thread.is_alive() or remotes.version != _version):
+            redraw = lambda: remotes.version != _version  # NoQA
+        else:
+            redraw = None
+        choice_c = self.wait_for_input(locs=locals(), terminate=True, redraw=redraw)
         choice = choice_c.lower
         # TODO Temporary local only refresh refactor to action object
         if choice == 'rl':
@@ -9,7 +9,7 @@ flow="n"
 parity="n"
 dbits=8
 
-cloud_file="/etc/ConsolePi/cloud.json"
+cloud_db="/etc/ConsolePi/cloud.db"
 resize_bin="/etc/ConsolePi/src/consolepi-commands/resize"
 WORD="default"
 # . /etc/ConsolePi/ConsolePi.conf
@@ -33,9 +33,23 @@ get_tty_name() {
 
 }
 
+# -- Output host,ip,user,device,port for each adapter on each remote in the local cloud cache (sqlite) --
+get_cloud_cache() {
+    python3 - "$cloud_db" <<'EOF' 2>/dev/null
+import json, sqlite3, sys
+conn = sqlite3.connect(sys.argv[1], timeout=5)
+for host, data in conn.execute('SELECT host, data FROM remotes ORDER BY host'):
+    data = json.loads(data)
+    adapters = data.get('adapters') or {}
+    for dev in sorted(adapters) if isinstance(adapters, dict) else []:
+        port = (adapters[dev].get('config') or {}).get('port', '')
+        print(f"{host},{data.get('rem_ip', '')},{data.get('user', 'pi')},{dev},{port}")
+EOF
+}
+
 # Depricated. Remote Device and power support available via consolepi-menu command
 get_remote_devices() {
-    if [[ -f $cloud_file ]]; then
+    if [[ -f $cloud_db ]]; then
         unset rem_cmd_list
         prev_host="init"
         while IFS=, read rem_host rem_ip rem_user rem_dev rem_port
@@ -47,7 +61,7 @@ get_remote_devices() {
                 prev_host=$rem_host
                 ((item++))
             fi
-        done <"$cloud_file"
+        done < <(get_cloud_cache)
         echo " -- "
     fi
 }
@@ -392,7 +406,7 @@ exit_script() {
 
 main() {
     get_tty_devices
-    if [[ $tty_list ]]; then # || [ -f $cloud_file ]; # then (disabling cloud local only for blue user)
+    if [[ $tty_list ]]; then # || [ -f $cloud_db ]; # then (disabling cloud local only for blue user)
 	    ttyusb_connected=true
 	else
 	    echo -e "\n*******************************\n"
@@ -76,6 +76,11 @@ class MDNS_Browser:
                         from_mdns_adapters = mdns_data.get('adapters')
                         mdns_data['rem_ip'] = rem_ip
                         mdns_data['adapters'] = from_mdns_adapters if from_mdns_adapters else cur_known_adapters
+                        if not from_mdns_adapters and cur_known_adapters:
+                            # keep the ETag/generation of the cached adapters so API only returns changes
+                            for k in ['adapters_etag', 'adapters_gen']:
+                                if cpi.remotes.data[hostname].get(k):
+                                    mdns_data[k] = cpi.remotes.data[hostname][k]
                         mdns_data['source'] = 'mdns'
                         mdns_data['upd_time'] = int(time.time())
                         mdns_data = {hostname: mdns_data}
@@ -89,6 +94,7 @@ class MDNS_Browser:
                             try:
                                 # TODO we are setting update time here so always result in a cache update with the restart timer
                                 res = cpi.remotes.api_reachable(hostname, mdns_data[hostname])
+                                cpi.remotes.scoreboard.save_later()  # mdns events are frequent, batch the writes
                                 update_cache = res.update
                                 if not res.data.get('adapters'):
                                     self.no_adapters.append(hostname)
@@ -178,3 +184,4 @@ if __name__ == '__main__':
     finally:
         if mdns.zc is not None:
             mdns.zc.close()
+        mdns.cpi.remotes.scoreboard.flush()
@@ -5,7 +5,6 @@ import time
 import json
 import socket
 import pyudev
-import threading
 import struct
 import sys
 try:
@@ -17,9 +16,13 @@ sys.path.insert(0, '/etc/ConsolePi/src/pypkg')
 from consolepi import log, config  # NoQA
 from consolepi.consolepi import ConsolePi  # NoQA
 from consolepi.gdrive import GoogleDrive  # NoQA
+from consolepi.watch import Debouncer  # NoQA
 
 
-UPDATE_DELAY = 30
+MDNS_QUIET = 3  # re-register once no udev/interface events have arrived for this many seconds
+MDNS_MAX_DELAY = 15  # or this many seconds after the first event if they keep arriving
+CLOUD_QUIET = 10  # cloud updates are more expensive, wait for a longer quiet window
+UPDATE_DELAY = 30  # max seconds a cloud update is delayed by a continuous stream of events
 
 
 class MDNS_Register:
@@ -28,6 +31,9 @@ class MDNS_Register:
         self.zeroconf = Zeroconf()
         self.context = pyudev.Context()
         self.cpi = ConsolePi()
+        # udev/interface events are collected, mdns (and cloud) are updated once after each burst
+        self.mdns_debouncer = Debouncer(self.refresh_mdns, MDNS_QUIET, MDNS_MAX_DELAY, name='mdns_refresh')
+        self.cloud_debouncer = Debouncer(self.trigger_cloud_update, CLOUD_QUIET, UPDATE_DELAY, name='cloud_update')
 
     def build_info(self, squash=None, local_adapters=None):
         local = self.cpi.local
@@ -64,43 +70,37 @@ class MDNS_Register:
 
         return info
 
-    def update_mdns(self, device=None, action=None, *args, **kwargs):
+    def update_mdns(self, device=None, action=None, *args, reason=None, **kwargs):
+        if device is not None:
+            reason = f'{device.action} {device.sys_name}'
+        log.debug(f'[MDNS REG] detected change: {reason}')
+        self.mdns_debouncer.trigger(reason)
+
+    def refresh_mdns(self, reasons: list):
+        '''Re-register mdns with data built after the burst of events (reasons) has settled.'''
         zeroconf = self.zeroconf
+        local = self.cpi.local
         info = self.try_build_info()
+        log.info(f'[MDNS REG] {len(reasons)} change(s) detected: {", ".join(sorted(set(reasons)))}')
+        if local.is_published('mdns') and (not config.cloud or local.is_published('cloud')):
+            log.info(f'[MDNS REG] local data unchanged (generation {local.generation}), not re-registering')
+            return
 
-        def sub_restart_zc():
-            log.info('[MDNS REG] mdns_refresh thread Start... Delaying {} Seconds'.format(UPDATE_DELAY))
-            time.sleep(UPDATE_DELAY)  # Wait x seconds and then update, to accomodate multiple add removes
+        if not local.is_published('mdns'):
+            _hash = local.hash
             zeroconf.update_service(info)
             zeroconf.unregister_service(info)
             time.sleep(5)
             zeroconf.register_service(info)
-            log.info('[MDNS REG] mdns_refresh thread Completed')
+            local.set_published('mdns', _hash)
+            log.info('[MDNS REG] mdns_refresh Completed')
 
-        if device is not None:
-            abort_mdns = False
-            for thread in threading.enumerate():
-                if 'mdns_refresh' in thread.name:
-                    log.debug('[MDNS REG] Another mdns_refresh thread already queued, this thread will abort')
-                    abort_mdns = True
-                    break
-
-            if not abort_mdns:
-                threading.Thread(target=sub_restart_zc, name='mdns_refresh', args=()).start()
-                log.debug('[MDNS REG] mdns_refresh Thread Started.  Current Threads:\n    {}'.format(threading.enumerate()))
-
-            log.info('[MDNS REG] detected change: {} {}'.format(device.action, device.sys_name))
-            if config.cloud:     # pylint: disable=maybe-no-member
-                abort = False
-                for thread in threading.enumerate():
-                    if 'cloud_update' in thread.name:
-                        log.debug('[MDNS REG] Another cloud Update thread already queued, this thread will abort')
-                        abort = True
-                        break
-
-                if not abort:
-                    threading.Thread(target=self.trigger_cloud_update, name='cloud_update', args=()).start()
-                    log.debug('[MDNS REG] Cloud Update Thread Started.  Current Threads:\n    {}'.format(threading.enumerate()))
+        if config.cloud:     # pylint: disable=maybe-no-member
+            self.cloud_debouncer.trigger('local data changed')
+
+    def interfaces_changed(self, interfaces):
+        self.update_mdns(reason='interfaces {}'.format(
+            ', '.join(f'{k} {v["ip"]}' for k, v in interfaces.items() if not k.startswith('_'))))
 
     def try_build_info(self):
         # Try sending with all data
@@ -127,12 +127,15 @@ class MDNS_Register:
 
         return info
 
-    def trigger_cloud_update(self):
+    def trigger_cloud_update(self, reasons: list = None):
         local = self.cpi.local
         remotes = self.cpi.remotes
-        log.info('[MDNS REG] Cloud Update triggered delaying {} seconds'.format(UPDATE_DELAY))
-        time.sleep(UPDATE_DELAY)  # Wait 30 seconds and then update, to accomodate multiple add removes
+        log.info('[MDNS REG] Cloud Update triggered')
         data = local.build_local_dict(refresh=True)
+        if local.is_published('cloud'):
+            log.info(f'[MDNS REG] Cloud Update skipped, local data unchanged (generation {local.generation})')
+            return
+        _hash = local.hash
         for a in local.data[local.hostname].get('adapters', {}):
             if 'udev' in local.data[local.hostname]['adapters'][a]:
                 del local.data[local.hostname]['adapters'][a]['udev']
@@ -145,22 +148,30 @@ class MDNS_Register:
         remote_consoles = cloud.update_files(data)
 
         # Send remotes learned from cloud file to local cache
-        if len(remote_consoles) > 0 and 'Gdrive-Error' not in remote_consoles:
-            remotes.update_local_cloud_file(remote_consoles)
-            log.info('[MDNS REG] Cloud Update Completed, Found {} Remote ConsolePis'.format(len(remote_consoles)))
+        if 'Gdrive-Error' in remote_consoles:
+            log.warning(f'[MDNS REG] Cloud Update Failed: {remote_consoles}')
         else:
-            log.warning('[MDNS REG] Cloud Update Completed, No remotes found, or Error Occured')
+            local.set_published('cloud', _hash)
+            if len(remote_consoles) > 0:
+                remotes.update_local_cloud_file(remote_consoles)
+                log.info('[MDNS REG] Cloud Update Completed, Found {} Remote ConsolePis'.format(len(remote_consoles)))
+            else:
+                log.warning('[MDNS REG] Cloud Update Completed, No remotes found')
 
     def run(self):
         zeroconf = self.zeroconf
         info = self.try_build_info()
+        _hash = self.cpi.local.hash  # hash of the data info was built from
 
         zeroconf.register_service(info)
+        self.cpi.local.set_published('mdns', _hash)  # only recorded once the service is registered
         # monitor udev for add/remove of usb-serial adapters
         monitor = pyudev.Monitor.from_netlink(self.context)
         monitor.filter_by('usb')
         observer = pyudev.MonitorObserver(monitor, name='udev_monitor', callback=self.update_mdns)
         observer.start()
+        # monitor interfaces (rtnetlink) so ip changes are advertised, only real changes trigger an update
+        self.cpi.local.start_interface_tracker(on_change=self.interfaces_changed)
         try:
             while True:
                 time.sleep(1)
@@ -123,6 +123,10 @@ utils = Utils()
 
 log = ConsolePiLog(LOG_FILE)
 
+from consolepi.apiclient import ApiClient  # type: ignore # NoQA
+
+api_client = ApiClient()  # NoQA - shared keep-alive pool for requests to remote ConsolePis
+
 from consolepi.config import Config  # type: ignore # NoQA
 
 config = Config()  # NoQA
@@ -0,0 +1,96 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+import threading
+import time
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+POOL_HOSTS = 256  # number of per-host connection pools kept (LRU)
+POOL_MAXSIZE = 4  # connections kept alive per host
+
+
+class ApiClient:
+    '''Shared keep-alive HTTP client for ConsolePi to ConsolePi API requests.
+
+    A single requests Session with a connection pool per remote host, so repeat
+    requests to the same remote reuse the existing TCP connection.  Tracks per host
+    request counts, new connections (handshakes) and time spent establishing them.
+    '''
+
+    def __init__(self, pool_hosts=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE):
+        self._lock = threading.Lock()
+        self.counters = {}
+        client = self
+
+        class TimedHTTPConnection(HTTPConnection):
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                client.record_connect(self.host, time.perf_counter() - start)
+
+        class TimedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = TimedHTTPConnection
+
+        class PooledAdapter(HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = {
+                    **self.poolmanager.pool_classes_by_scheme,
+                    'http': TimedHTTPConnectionPool
+                }
+
+        self.session = requests.Session()
+        self.session.mount('http://', PooledAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize))
+
+    def _host_counters(self, host):
+        if host not in self.counters:
+            self.counters[host] = {'requests': 0, 'errors': 0, 'connections': 0, 'handshake_time': 0.0}
+        return self.counters[host]
+
+    def record_connect(self, host, elapsed):
+        with self._lock:
+            _this = self._host_counters(host)
+            _this['connections'] += 1
+            _this['handshake_time'] += elapsed
+
+    def request(self, method, url, **kwargs):
+        '''Send request via the pooled session, params are the same as requests.request.'''
+        host = urlparse(url).hostname
+        with self._lock:
+            self._host_counters(host)['requests'] += 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self._host_counters(host)['errors'] += 1
+            raise
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def stats(self, host=None):
+        '''Return connection reuse and handshake counters.
+
+        params:
+            host(str): return counters for a single host, totals for all hosts if not provided
+
+        returns:
+            dict: requests, errors (requests that raised), connections (new TCP connections),
+                  reused, handshake_time (total secs), avg_handshake (secs per new connection)
+        '''
+        with self._lock:
+            hosts = [host] if host else list(self.counters)
+            _stats = {'requests': 0, 'errors': 0, 'connections': 0, 'handshake_time': 0.0}
+            for h in hosts:
+                for k, v in self.counters.get(h, {}).items():
+                    _stats[k] += v
+
+        _stats['reused'] = max(_stats['requests'] - _stats['errors'] - _stats['connections'], 0)
+        _stats['avg_handshake'] = 0.0 if not _stats['connections'] else _stats['handshake_time'] / _stats['connections']
+        return _stats
+
+    def close(self):
+        self.session.close()
@@ -1,11 +1,13 @@
 #!/etc/ConsolePi/venv/bin/python3
 import os
+import copy
 import yaml
 import json
 import shutil
 from pathlib import Path
 
 from consolepi import utils, log  # type: ignore
+from consolepi.remotecache import RemoteCache, RemoteCacheWatcher  # type: ignore
 LOG_FILE = '/var/log/ConsolePi/consolepi.log'
 
 # overridable defaults (via OVERRIDES section of ConsolePi.yaml)
@@ -15,6 +17,9 @@ DEFAULT_PARITY = 'n'
 DEFAULT_FLOW = 'n'
 DEFAULT_SBITS = 1
 DEFAULT_REMOTE_TIMEOUT = 3
+DEFAULT_REMOTE_VERIFY_WORKERS = 25  # max concurrent remote verifications
+DEFAULT_REMOTE_VERIFY_DEADLINE = 10  # seconds allowed to verify all remotes
+DEFAULT_API_OUTLET_POLL = 30  # seconds between background outlet state refresh in the api
 DEFAULT_DLI_TIMEOUT = 7
 DEFAULT_SO_TIMEOUT = 3  # smart outlets
 DEFAULT_CYCLE_TIME = 3
@@ -47,12 +52,16 @@ class Config():
         self.hosts = self.get_hosts()
         self.power = self.cfg.get('power', False)
         self.outlets = {} if not self.power else self.get_outlets_from_file()
+        self.cloud_cache = RemoteCache(self.static.get('LOCAL_CLOUD_DB', '/etc/ConsolePi/cloud.db'),
+                                       legacy_file=self.static.get('LOCAL_CLOUD_FILE'))
+        self.cache_watcher = RemoteCacheWatcher(self.cloud_cache)  # started on first use
         self.remotes = self.get_remotes_from_file()
-        self.remote_update = self.get_remotes_from_file
+        self.remote_update = self.cache_watcher.get  # only reloads from the db if it changed
         self.root = True if os.geteuid() == 0 else False
 
-    def get_remotes_from_file(self):
-        return self.get_json_file(self.static.get('LOCAL_CLOUD_FILE'))
+    def get_remotes_from_file(self, host=None):
+        '''Return remote data from local cloud cache, data for a single remote if host is provided.'''
+        return self.cloud_cache.get(host)
 
     def get_config_all(self, yaml_cfg=None, legacy_cfg=None):
         '''Parse bash style cfg vars from cfg file convert to class attributes.'''
@@ -103,6 +112,10 @@ class Config():
         self.cloud_pull_only = ovrd.get('cloud_pull_only', False)
         self.compact_mode = ovrd.get('compact_mode', False)
         self.remote_timeout = int(ovrd.get('remote_timeout', DEFAULT_REMOTE_TIMEOUT))
+        self.remote_verify_workers = int(ovrd.get('remote_verify_workers', DEFAULT_REMOTE_VERIFY_WORKERS))
+        self.remote_verify_deadline = int(ovrd.get('remote_verify_deadline', DEFAULT_REMOTE_VERIFY_DEADLINE))
+        self.api_outlet_poll = int(ovrd.get('api_outlet_poll', DEFAULT_API_OUTLET_POLL))
+        self.api_fast_start = str(ovrd.get('api_fast_start', False)).lower() in ['true', 'yes', '1']
         self.dli_timeout = int(ovrd.get('dli_timeout', DEFAULT_DLI_TIMEOUT))
         self.so_timeout = int(ovrd.get('smartoutlet_timeout', DEFAULT_SO_TIMEOUT))
         self.cycle_time = int(ovrd.get('cycle_time', DEFAULT_CYCLE_TIME))
@@ -252,7 +265,62 @@ class Config():
 
         return host_dict
 
+    def ser2net_cache_key(self):
+        '''Return key identifying the current ser2net.conf (inode/mtime/size) and the settings that affect parsing.
+
+        returns None if ser2net.conf is not found.
+        '''
+        try:
+            st = os.stat(self.static.get('SER2NET_FILE'))
+        except (OSError, TypeError):
+            return None
+        return [st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size, self.picocom_ver, self.default_baud,
+                self.static.get('VALID_BAUD')]
+
     def get_ser2net(self):
+        '''Return connection info for serial adapters from ser2net.conf, only re-parsed if the file changed.
+
+        The parsed config is cached in memory and persisted to SER2NET_CACHE_FILE, keyed on the file's
+        inode/mtime/size, so the menu, api and mdns daemons share a single parse of each version of the file.
+
+        returns:
+            dict: see parse_ser2net
+        '''
+        key = self.ser2net_cache_key()
+        if key is None:
+            return self.parse_ser2net()  # logs that ser2net.conf was not found
+        if key == getattr(self, '_ser2net_key', None):
+            return copy.deepcopy(self._ser2net_cache)
+
+        cache_file = self.static.get('SER2NET_CACHE_FILE', '/etc/ConsolePi/.ser2net_cache.json')
+        try:
+            with open(cache_file) as f:
+                cache = json.load(f)
+            if cache.get('key') == key:
+                ser2net_conf = cache['ser2net']
+                log.debug(f'[SER2NET] Using cached parse of {self.static["SER2NET_FILE"]} from {cache_file}')
+            else:
+                cache = None
+        except (OSError, ValueError, KeyError):
+            cache = None
+
+        if cache is None:
+            ser2net_conf = self.parse_ser2net()
+            # the file may have changed while it was parsed, only persist if it's still the version parsed
+            if self.ser2net_cache_key() == key:
+                tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+                try:
+                    with open(tmp_file, 'w') as f:
+                        json.dump({'key': key, 'ser2net': ser2net_conf}, f)
+                    os.replace(tmp_file, cache_file)
+                    utils.set_perm(cache_file)
+                except OSError as e:
+                    log.warning(f'[SER2NET] Unable to save {cache_file}\n\t{e}')
+
+        self._ser2net_key, self._ser2net_cache = key, ser2net_conf
+        return copy.deepcopy(ser2net_conf)
+
+    def parse_ser2net(self):
         '''Parse ser2net.conf to extract connection info for serial adapters
 
         retruns 2 level dict (empty dict if ser2net.conf not found or empty):
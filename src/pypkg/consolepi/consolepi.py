@@ -11,7 +11,7 @@ from consolepi.menu import Menu  # NoQA
 
 
 class ConsolePi():
-    def __init__(self, bypass_remotes=False):
+    def __init__(self, bypass_remotes=False, bg_remotes=False):
         # self.response = Response
         self.menu = Menu()
         self.local = Local()
@@ -23,7 +23,7 @@ class ConsolePi():
             self.pwr = None
         self.cpiexec = ConsolePiExec(config, self.pwr, self.local, self.menu)
         if not bypass_remotes:
-            self.remotes = Remotes(self.local, self.cpiexec)
+            self.remotes = Remotes(self.local, self.cpiexec, background=bg_remotes)
 
         # TODO Move to menu launch and prompt user
         # verify TELNET is installed and install if not if hosts of type TELNET are defined.
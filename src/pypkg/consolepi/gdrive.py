@@ -140,7 +140,13 @@ class GoogleDrive:
         response = self.exec_request(request)
         log.debug('[GDRIVE]: resize_cols response: {}'.format(response))
 
-    def update_files(self, data):
+    def update_files(self, data, push: bool = True):
+        '''Update Google Drive with data for this ConsolePi and return the data for the remotes found.
+
+        params:
+            data(dict): local data for this ConsolePi
+            push(bool): set False to skip updating this ConsolePis row (i.e. data is unchanged since the last push)
+        '''
         for x in data[self.hostname]['adapters']:
             if 'udev' in data[self.hostname]['adapters'][x]:
                 del data[self.hostname]['adapters'][x]['udev']
@@ -187,7 +193,9 @@ class GoogleDrive:
             range_ = 'a' + str(cnt) + ':b' + str(cnt)
 
             # -- // Update gdrive with this ConsolePis data \\ --
-            if not config.cloud_pull_only:
+            if not push and k == self.hostname:
+                log.info('[GDRIVE]: Local data unchanged since last update, not updating cloud with data from this host')
+            elif not config.cloud_pull_only:
                 if found:
                     log.info('[GDRIVE]: Updating ' + str(k) + ' data found on row ' + str(cnt) + ' of Google Drive config')
                     request = service.spreadsheets().values().update(spreadsheetId=spreadsheet_id, range=range_,
@@ -0,0 +1,152 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyudev
+from consolepi import log, config, metrics  # type: ignore
+from consolepi.watch import FileWatcher  # type: ignore
+
+DEBOUNCE = 0.5  # secs to wait after a udev/ser2net event for more (multi-port adapters arrive as a burst)
+UDEV_ACTIONS = ['add', 'remove', 'move', 'change']
+REBUILD_TIME = metrics.histogram(
+    'consolepi_inventory_rebuild_seconds', 'Adapter inventory rebuild duration', ['trigger']
+)
+
+
+class AdapterInventory:
+    '''Live local adapter inventory for long running processes (api).
+
+    local.adapters is rebuilt in the background when udev reports a tty being added/removed (netlink monitor)
+    or ser2net.conf changes (inotify), so requests can be served from memory.  If either event source is
+    not available live is False and callers should fall back to refreshing on demand.
+
+    params:
+        local: Local object whose adapters are maintained
+        on_change: optional callback, called with the new adapter dict after each rebuild
+    '''
+
+    def __init__(self, local, on_change=None):
+        self.local = local
+        self.on_change = on_change
+        self.live = False
+        self.last_update = time.time()
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._pending = {'udev': False, 'ser2net': False}
+        self._pending_lock = threading.Lock()  # events set pending from the udev/inotify threads, the worker swaps it
+        self._observer = None
+        self._ser2net_watcher = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='adapter_rebuild')
+        self._running = None  # asyncio task for the rebuild in progress (refresh)
+        self._queued = None  # asyncio task for the next rebuild, shared by all callers that arrive while one is running
+
+    def start(self) -> bool:
+        '''Start udev monitor and ser2net watcher.
+
+        returns:
+            bool: True if both event sources started (inventory is live)
+        '''
+        try:
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by('tty')
+            self._observer = pyudev.MonitorObserver(monitor, callback=self._udev_event, name='adapter_inventory_udev')
+            self._observer.start()
+            self.local.index_live = True  # adapter index is updated from udev events, no need to re-scan
+        except Exception as e:
+            log.warning(f'[INVENTORY] Unable to start udev monitor\n\t{e}')
+            return False
+
+        ser2net_file = config.static.get('SER2NET_FILE', '/etc/ser2net.conf')
+        self._ser2net_watcher = FileWatcher([ser2net_file], self._ser2net_event, name='adapter_inventory_ser2net')
+        if not self._ser2net_watcher.start():
+            log.warning(f'[INVENTORY] Unable to watch {ser2net_file} for changes')
+            self._stop_observer()
+            return False
+
+        threading.Thread(target=self._worker, name='adapter_inventory', daemon=True).start()
+        self.live = True
+        log.info('[INVENTORY] Adapter inventory is live (udev monitor / ser2net watcher started)')
+        return True
+
+    def _stop_observer(self):
+        '''Stop the udev monitor, the adapter index goes back to being synced on each rebuild.'''
+        try:
+            self._observer.stop()
+        except Exception as e:
+            log.warning(f'[INVENTORY] Unable to stop udev monitor\n\t{e}')
+        self._observer = None
+        self.local.index_live = False
+
+    def _udev_event(self, device):
+        if device.action in UDEV_ACTIONS:
+            log.debug(f'[INVENTORY] udev {device.action} {device.device_node or device.sys_name}')
+            try:
+                self.local.udev_event(device)
+            except Exception as e:
+                log.error(f'[INVENTORY] Unable to update adapter index for {device.sys_name}\n\t{e}')
+                self.local.index_live = False  # fall back to syncing the index on each rebuild
+            with self._pending_lock:
+                self._pending['udev'] = True
+                self._event.set()
+
+    def _ser2net_event(self, paths):
+        log.debug(f'[INVENTORY] {", ".join(paths)} changed')
+        with self._pending_lock:
+            self._pending['ser2net'] = True
+            self._event.set()
+
+    def _worker(self):
+        while True:
+            self._event.wait()
+            time.sleep(DEBOUNCE)
+            with self._pending_lock:
+                pending, self._pending = self._pending, {'udev': False, 'ser2net': False}
+                self._event.clear()
+            udev, ser2net = pending['udev'], pending['ser2net']
+            try:
+                self.rebuild(udev=udev, ser2net=ser2net, trigger='event')
+            except Exception as e:
+                log.error(f'[INVENTORY] Adapter rebuild failed\n\t{e}')
+
+    def rebuild(self, udev: bool = True, ser2net: bool = True, trigger: str = 'request'):
+        '''Rebuild local adapter data.
+
+        params:
+            udev(bool): re-scan udev for attached adapters
+            ser2net(bool): re-parse ser2net.conf
+            trigger(str): what caused the rebuild (event | request), used to label the rebuild time metric
+        '''
+        with self._lock, REBUILD_TIME.time(trigger=trigger):
+            if ser2net:
+                config.ser2net_conf = config.get_ser2net()
+            if udev and trigger != 'event':
+                self.local.sync_adapter_index()  # cheap if nothing changed, catches anything an event missed
+            self.local.adapters = self.local.build_adapter_dict(refresh=udev)
+            self.local.data = self.local.build_local_dict()  # /details and the local hash are served from data
+            self.last_update = time.time()
+            if self.on_change:
+                self.on_change(self.local.adapters)
+
+    async def refresh(self):
+        '''Rebuild adapters in a worker thread without blocking the event loop (single-flight).
+
+        Concurrent callers share one rebuild.  Callers that arrive while a rebuild is already running
+        share a single follow-up rebuild, so the data returned is never older than the request.
+        '''
+        if self._queued is None:
+            self._queued = asyncio.ensure_future(self._run_rebuild(self._running))
+        await asyncio.shield(self._queued)  # a client disconnecting does not cancel the rebuild for the others
+
+    async def _run_rebuild(self, running):
+        if running is not None:
+            await asyncio.wait([running])
+        this = self._running = self._queued
+        self._queued = None
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.rebuild)
+        finally:
+            if self._running is this:
+                self._running = None
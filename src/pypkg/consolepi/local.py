@@ -4,8 +4,15 @@ import pyudev
 import socket
 import netifaces as ni
 import os
+import re
+import threading
 import time
-from consolepi import utils, log, config  # type: ignore
+from datetime import timedelta
+from consolepi import utils, log, config, metrics  # type: ignore
+from consolepi.watch import NetlinkWatcher  # type: ignore
+
+USB_IFACE_RE = re.compile(r'^\d+-[\d.]+:\d+\.\d+$')  # usb interface component of a sysfs path i.e. 1-1.2:1.0
+UDEV_SCAN = metrics.histogram('consolepi_udev_scan_seconds', 'Time spent scanning udev for local adapters')
 
 
 class Local():
@@ -13,12 +20,25 @@ class Local():
 
     def __init__(self):
         self.default_baud = config.default_baud
-        self.udev_adapters = self.detect_adapters()
+        self.adapter_index = None  # root_dev: {'stamp', 'name', 'data', 'parent', 'initialized'} see _index_device
+        self.index_live = False  # True if the index is kept current by udev events (udev_event)
+        self._index_lock = threading.RLock()
+        self._usb_parents = {}  # (usb device syspath, ID_SERIAL): resolved parent details see _resolve_usb_parent
+        with UDEV_SCAN.time():
+            self.udev_adapters = self.detect_adapters()
         self.adapters = self.build_adapter_dict()
         self.hostname = socket.gethostname()
         self.cpuserial = self.get_cpu_serial()
-        self.interfaces = self.get_if_info()
-        self.ip_list = self.get_ip_list()
+        self.interfaces_live = False  # True if interfaces are kept current by the interface tracker
+        self._if_watcher = None
+        self._if_callbacks = []
+        self._if_lock = threading.Lock()
+        if_addrs = self._read_ifaddresses()
+        self.interfaces = self._read_if_info(if_addrs)
+        self.ip_list = self._read_ip_list(if_addrs)
+        self.generation = 0  # incremented each time the content hash changes
+        self.hash = None  # content hash of adapters, interfaces and user see update_hash
+        self._published = {}  # publisher (mdns, cloud): hash of the data it last published
         self.data = self.build_local_dict()
         self.user = config.loc_user
         self.loc_home = os.path.expanduser(f'~{self.user}')
@@ -36,11 +56,47 @@ class Local():
                                 'interfaces': self.interfaces,
                                 'rem_ip': rem_ip,
                                 'user': config.cfg.get('rem_user', 'pi')}}
+        self.update_hash()
         return local
 
-    def detect_adapters(self, key=None):
+    def content_hash(self) -> str:
+        '''Return stable hash of adapters, interfaces and user (see utils.content_hash).'''
+        return utils.content_hash({'adapters': self.adapters, 'interfaces': self.interfaces,
+                                   'user': config.cfg.get('rem_user', 'pi')})
+
+    def update_hash(self) -> bool:
+        '''Update content hash, incrementing generation if it changed.
+
+        returns:
+            bool: True if local data changed
+        '''
+        _hash = self.content_hash()
+        if _hash == self.hash:
+            return False
+        self.hash = _hash
+        self.generation += 1
+        log.debug(f'[LOCAL] generation {self.generation}: local data changed ({_hash})')
+        return True
+
+    def is_published(self, publisher: str) -> bool:
+        '''Determine if publisher (i.e. mdns, cloud) has already published the current local data.'''
+        return self._published.get(publisher) is not None and self._published[publisher] == self.hash
+
+    def set_published(self, publisher: str, _hash: str = None):
+        '''Record the hash of the data publisher published (the current hash if not provided).'''
+        self._published[publisher] = _hash or self.hash
+
+    def detect_adapters(self, key=None, sync: bool = False):
         """Detect Locally Attached Adapters.
 
+        Adapters are served from the adapter index.  Unless the index is kept current by udev events
+        (index_live) it's synced first, only devices that are new or changed since the last sync are
+        re-processed.
+
+        params:
+            key(str): return only the adapter with this name
+            sync(bool): sync the index with udev even if it's live
+
         Returns
         -------
         dict
@@ -51,105 +107,198 @@ class Local():
         if key is not None:
             key = '/dev/' + key.split('/')[-1]  # key can be provided with or without /dev/ prefix
 
-        context = pyudev.Context()
+        with self._index_lock:
+            if sync or not self.index_live or self.adapter_index is None:
+                self.sync_adapter_index()
+
+            devs = {'_dup_ser': {}}
+            dup_ser = {}
+            for root_dev, entry in self.adapter_index.items():
+                if entry['name'] is None:
+                    continue
+                dev_name = entry['name']
+                devs[dev_name] = {**entry['data']}
+                if entry.get('initialized') is not None:
+                    devs[dev_name]['time_since_init'] = self._time_since_init(entry['initialized'])
+                if 'ttyAMA' in root_dev:
+                    continue
+
+                # --- // Handle Multi-Port adapters that use same serial for all interfaces \\ ---
+                # group path and ifnum of each dev by serial, serials that only appear once are dropped below
+                _ser = devs[dev_name]['id_serial_short']
+                _group = dup_ser.setdefault(_ser, {'id_paths': [], 'id_ifnums': []})
+                _group['id_paths'].append(devs[dev_name]['id_path'])
+                _group['id_ifnums'].append(devs[dev_name]['id_ifnum'])
+
+        devs['_dup_ser'] = {_ser: _group for _ser, _group in dup_ser.items() if len(_group['id_paths']) > 1}
+
+        return devs if key is None else devs[key]
+
+    @staticmethod
+    def _index_stamp(dev):
+        '''Values that change when a device is re-added or its udev aliases change (rename).'''
+        return (dev.properties.get('DEVPATH'), dev.properties.get('USEC_INITIALIZED'), dev.get('DEVLINKS', ''))
 
-        devs = {'_dup_ser': {}}
-        usb_list = [dev.properties['DEVPATH'].split('/')[-1] for dev in context.list_devices(ID_BUS='usb', subsystem='tty')]
-        pci_list = [dev.properties['DEVPATH'].split('/')[-1] for dev in context.list_devices(ID_BUS='pci', subsystem='tty')]
-        ama_list = [dev.replace('/dev/', '') for dev in config.cfg_yml.get('TTYAMA', {})]
-        root_dev_list = usb_list + pci_list + ama_list
+    def sync_adapter_index(self):
+        '''Sync the adapter index with udev, processing only devices that are new or changed.'''
+        with self._index_lock:
+            self._sync_adapter_index()
 
-        for root_dev in root_dev_list:
-            # determine if the device already has a udev alias & collect available path options for use on lame adapters
-            dev_name = by_path = by_id = None
+    def _sync_adapter_index(self):
+        context = pyudev.Context()
+        root_devs = {}
+        for bus in ['usb', 'pci']:
+            for dev in context.list_devices(ID_BUS=bus, subsystem='tty'):
+                root_devs[dev.properties['DEVPATH'].split('/')[-1]] = dev
+        for root_dev in [dev.replace('/dev/', '') for dev in config.cfg_yml.get('TTYAMA', {})]:
             try:
-                _dev = pyudev.Devices.from_name(context, 'tty', root_dev)
+                root_devs[root_dev] = pyudev.Devices.from_name(context, 'tty', root_dev)
             except pyudev._errors.DeviceNotFoundByNameError:
                 log.error(f'pyudev Ubable to find {root_dev}')
-                continue  # TODO Catching error as have seen it in consolepi-mdnsreg not sure if continue is appropriate
-            _devlinks = _dev.get('DEVLINKS', '').split()
-            if not _devlinks:   # skip occurs on non rpi and ttyAMA
-                if not root_dev.startswith('ttyAMA'):
-                    continue
-            else:
-                for _d in _devlinks:
-                    if '/dev/serial' not in _d:
-                        dev_name = _d.replace('/dev/', '')
-                    elif '/dev/serial/by-path/' in _d:
-                        by_path = _d
-                    elif '/dev/serial/by-id/' in _d:
-                        by_id = _d
-
-            dev_name = f'/dev/{root_dev}' if not dev_name else f'/dev/{dev_name}'
-            devs[dev_name] = {'by_path': by_path, 'by_id': by_id}
-            devs[dev_name]['root_dev'] = True if dev_name == f'/dev/{root_dev}' else False
-
-            # Gather all available properties from device
-            _props = {p.lower() if p != 'ID_USB_INTERFACE_NUM' else 'id_ifnum': _dev.properties[p]
-                      for p in _dev.properties}
-            devs[dev_name] = {**devs[dev_name], **_props}
-
-            # -- no need for remaining logic on ttyAMA adapters (local UART)
-            if 'ttyAMA' in root_dev:
-                # TODO clean up logic this is copy paste from below
-                # clean up some redundant or less useful properties
-                rm_list = ['devlinks', 'id_mm_candidate', 'id_model_enc', 'id_path_tag', 'tags', 'major', 'minor',
-                           'usec_initialized', 'id_vendor_enc', 'id_pci_interface_from_database', 'id_revision']
-
-                devs[dev_name] = {k: v for k, v in devs[dev_name].items() if k not in rm_list}
-
-                continue
-
-            # with some multi-port adapters the model_id and vendor_id need to be pulled from higher in stack
-            this_dev = _dev
-            while '0x' in this_dev.properties.get('ID_MODEL_ID', '0x') and hasattr(this_dev, 'parent'):
-                this_dev = this_dev.parent
-
-            # -- Collect path for mapping to specific USB port
-            # TODO clean this up not efficient could combine search for ID_MODEL_ID and devpath
-            lame_devpath = this_dev.attributes.get('devpath')
-            if lame_devpath and isinstance(lame_devpath, bytes):
-                lame_devpath = lame_devpath.decode('UTF-8')
-            else:
-                for p in _dev.ancestors:
-                    if 'devpath' in p.attributes.available_attributes:
-                        lame_devpath = p.attributes.get('devpath')
-                        if lame_devpath and isinstance(lame_devpath, bytes):
-                            lame_devpath = lame_devpath.decode('UTF-8')
-                            break
-
-            devs[dev_name]['lame_devpath'] = lame_devpath
-
-            fallback_ser = this_dev.properties.get('ID_SERIAL_SHORT')
-            devs[dev_name]['id_model_id'] = this_dev.properties['ID_MODEL_ID']
-            devs[dev_name]['id_vendor_id'] = this_dev.properties['ID_VENDOR_ID']
-            devs[dev_name]['time_since_init'] = f'{_dev.properties.device.time_since_initialized} ' \
-                                                f"as of {time.strftime('%x %I:%M:%S %p %Z', time.localtime(time.time()))}"
-
-            # clean up some redundant or less useful properties
-            rm_list = ['devlinks', 'id_mm_candidate', 'id_model_enc', 'id_path_tag', 'tags', 'major', 'minor',
-                       'usec_initialized', 'id_vendor_enc', 'id_pci_interface_from_database', 'id_revision']
-
-            devs[dev_name] = {k: v for k, v in devs[dev_name].items() if k not in rm_list}
-
-            # --- // Handle Multi-Port adapters that use same serial for all interfaces \\ ---
-            # Capture the dict in dup_ser it's later del if no additional devices present with the same serial
-            # Capture path and ifnum for any subsequent devs if ser is already in the dup_ser dict
-            _ser = devs[dev_name]['id_serial_short'] = _dev.get('ID_SERIAL_SHORT', fallback_ser)
-            if _ser not in devs['_dup_ser']:
-                devs['_dup_ser'][_ser] = {'id_paths': [], 'id_ifnums': []}
-
-            devs['_dup_ser'][_ser]['id_paths'].append(devs[dev_name]['id_path'])
-            devs['_dup_ser'][_ser]['id_ifnums'].append(devs[dev_name]['id_ifnum'])
-
-        # --- // Clean up detection of Multi-Port adapters that use same serial for all interfaces \\ ---
-        # all dev serial #s are added to dup_ser as they are discovered
-        # remove any serial #s that only appeared once.
-        del_list = [_ser for _ser in devs['_dup_ser'] if len(devs['_dup_ser'][_ser]['id_paths']) == 1]
-        for i in del_list:
-            del devs['_dup_ser'][i]
 
-        return devs if key is None else devs[key]
+        index = {}
+        for root_dev, _dev in root_devs.items():
+            stamp = self._index_stamp(_dev)
+            entry = (self.adapter_index or {}).get(root_dev)
+            if entry is None or entry['stamp'] != stamp:
+                entry = {'stamp': stamp, **self._index_device(root_dev, _dev)}
+            index[root_dev] = entry
+        self.adapter_index = index
+        # drop memoized parents for usb devices that are no longer attached
+        _parents = set(e['parent'] for e in index.values())
+        self._usb_parents = {k: v for k, v in self._usb_parents.items() if k in _parents}
+
+    def udev_event(self, device):
+        '''Update the adapter index from a udev tty event (called by long running processes monitoring udev).'''
+        root_dev = device.sys_name
+        with self._index_lock:
+            if self.adapter_index is None:
+                return
+            if device.action == 'remove':
+                self.adapter_index.pop(root_dev, None)
+            elif device.get('ID_BUS') in ['usb', 'pci'] or root_dev in [
+                    dev.replace('/dev/', '') for dev in config.cfg_yml.get('TTYAMA', {})]:
+                try:
+                    _dev = pyudev.Devices.from_name(pyudev.Context(), 'tty', root_dev)
+                except pyudev._errors.DeviceNotFoundByNameError:
+                    self.adapter_index.pop(root_dev, None)
+                    return
+                self.adapter_index[root_dev] = {'stamp': self._index_stamp(_dev), **self._index_device(root_dev, _dev)}
+
+    def _index_device(self, root_dev, _dev):
+        '''Collect adapter details for a single tty device.
+
+        returns:
+            dict: name: the adapter name (/dev/<alias or root_dev>) or None if the device is not an adapter
+                  data: the adapter details
+                  parent: memo key of the usb device the adapter is on (see _resolve_usb_parent)
+                  initialized: epoch time udev initialized the device, time_since_init is rendered from it on read
+        '''
+        # determine if the device already has a udev alias & collect available path options for use on lame adapters
+        dev_name = by_path = by_id = None
+        _devlinks = _dev.get('DEVLINKS', '').split()
+        if not _devlinks:   # skip occurs on non rpi and ttyAMA
+            if not root_dev.startswith('ttyAMA'):
+                return {'name': None, 'data': {}, 'parent': None}
+        else:
+            for _d in _devlinks:
+                if '/dev/serial' not in _d:
+                    dev_name = _d.replace('/dev/', '')
+                elif '/dev/serial/by-path/' in _d:
+                    by_path = _d
+                elif '/dev/serial/by-id/' in _d:
+                    by_id = _d
+
+        dev_name = f'/dev/{root_dev}' if not dev_name else f'/dev/{dev_name}'
+        data = {'by_path': by_path, 'by_id': by_id}
+        data['root_dev'] = True if dev_name == f'/dev/{root_dev}' else False
+
+        # Gather all available properties from device
+        _props = {p.lower() if p != 'ID_USB_INTERFACE_NUM' else 'id_ifnum': _dev.properties[p]
+                  for p in _dev.properties}
+        data = {**data, **_props}
+
+        # clean up some redundant or less useful properties
+        rm_list = ['devlinks', 'id_mm_candidate', 'id_model_enc', 'id_path_tag', 'tags', 'major', 'minor',
+                   'usec_initialized', 'id_vendor_enc', 'id_pci_interface_from_database', 'id_revision']
+
+        # -- no need for remaining logic on ttyAMA adapters (local UART)
+        if 'ttyAMA' in root_dev:
+            return {'name': dev_name, 'data': {k: v for k, v in data.items() if k not in rm_list}, 'parent': None}
+
+        # with some multi-port adapters the model_id and vendor_id need to be pulled from higher in stack
+        # all ports on a multi-port adapter share the result, it's resolved once per physical usb device
+        parent = self._resolve_usb_parent(_dev)
+        data['lame_devpath'] = parent['lame_devpath']
+
+        fallback_ser = parent['fallback_ser']
+        data['id_model_id'] = parent['id_model_id']
+        data['id_vendor_id'] = parent['id_vendor_id']
+        initialized = time.time() - _dev.properties.device.time_since_initialized.total_seconds()
+        data['time_since_init'] = self._time_since_init(initialized)
+
+        data = {k: v for k, v in data.items() if k not in rm_list}
+        data['id_serial_short'] = _dev.get('ID_SERIAL_SHORT', fallback_ser)
+
+        return {'name': dev_name, 'data': data, 'parent': parent['key'], 'initialized': initialized}
+
+    @staticmethod
+    def _time_since_init(initialized: float) -> str:
+        '''Return time since udev initialized the device (as of now), as udev formats it.'''
+        now = time.time()
+        return f"{timedelta(seconds=now - initialized)} as of {time.strftime('%x %I:%M:%S %p %Z', time.localtime(now))}"
+
+    @staticmethod
+    def _usb_parent_key(_dev):
+        '''Return key for the physical usb device a tty belongs to (syspath of the usb device, ID_SERIAL).
+
+        The syspath is taken from the DEVPATH of the tty (the path up to the first usb interface component
+        i.e. 1-1.2:1.0), so no parent lookups are needed.  ID_SERIAL is included in case a different
+        device is plugged into the same port.  None if the tty is not on a usb device.
+        '''
+        _path = _dev.properties.get('DEVPATH', '').split('/')
+        for idx, part in enumerate(_path):
+            if USB_IFACE_RE.match(part):
+                return ('/sys' + '/'.join(_path[0:idx]), _dev.properties.get('ID_SERIAL'))
+
+    def _resolve_usb_parent(self, _dev):
+        '''Walk the parent chain of a tty for model/vendor id and devpath, memoized by physical usb device.
+
+        returns:
+            dict: id_model_id, id_vendor_id, fallback_ser (ID_SERIAL_SHORT of the device the ids came from),
+                lame_devpath (usb devpath used to map to a specific usb port), key (memo key)
+        '''
+        key = self._usb_parent_key(_dev)
+        if key is not None and key in self._usb_parents:
+            return self._usb_parents[key]
+
+        this_dev = _dev
+        while '0x' in this_dev.properties.get('ID_MODEL_ID', '0x') and hasattr(this_dev, 'parent'):
+            this_dev = this_dev.parent
+
+        # -- Collect path for mapping to specific USB port
+        lame_devpath = this_dev.attributes.get('devpath')
+        if lame_devpath and isinstance(lame_devpath, bytes):
+            lame_devpath = lame_devpath.decode('UTF-8')
+        else:
+            for p in _dev.ancestors:
+                if 'devpath' in p.attributes.available_attributes:
+                    lame_devpath = p.attributes.get('devpath')
+                    if lame_devpath and isinstance(lame_devpath, bytes):
+                        lame_devpath = lame_devpath.decode('UTF-8')
+                        break
+
+        parent = {
+            'id_model_id': this_dev.properties['ID_MODEL_ID'],
+            'id_vendor_id': this_dev.properties['ID_VENDOR_ID'],
+            'fallback_ser': this_dev.properties.get('ID_SERIAL_SHORT'),
+            'lame_devpath': lame_devpath,
+            'key': key
+        }
+        # a devpath on the tty itself would be per port, only the usb device level result is shared
+        if key is not None and not (this_dev is _dev and this_dev.attributes.get('devpath')):
+            self._usb_parents[key] = parent
+        return parent
 
     def default_ser_config(self, tty_dev, tty_port=0000):
         '''Return default serial parameters when no match found in ser2net'''
@@ -167,7 +316,8 @@ class Local():
     def build_adapter_dict(self, refresh=False):
         '''Create final adapter dict from udev ser2net and outlet dicts.'''
         if refresh or not hasattr(self, 'udev_adapters'):
-            self.udev_adapters = self.detect_adapters()
+            with UDEV_SCAN.time():
+                self.udev_adapters = self.detect_adapters()
         udev = {a: self.udev_adapters[a] for a in self.udev_adapters if a != '_dup_ser'}
         linked = [] if not config.outlets else config.outlets['linked']
         ser2net = {} if not config.ser2net_conf else config.ser2net_conf
@@ -193,23 +343,82 @@ class Local():
             return res[1]
 
     def get_if_info(self):
-        '''Build and return dict with interface info.'''
-        if_list = [i for i in ni.interfaces() if i != 'lo' and 'docker' not in i]
+        '''Build and return dict with interface info (from memory if the interface tracker is running).'''
+        if self.interfaces_live:
+            return self.interfaces
+        return self._read_if_info(self._read_ifaddresses())
+
+    def get_ip_list(self):
+        if self.interfaces_live:
+            return self.ip_list
+        return self._read_ip_list(self._read_ifaddresses())
+
+    @staticmethod
+    def _read_ifaddresses():
+        '''Return {interface: addresses} for all interfaces, ni.ifaddresses is called once per interface.'''
+        return {_if: ni.ifaddresses(_if) for _if in ni.interfaces() if _if != 'lo' and 'docker' not in _if}
+
+    @staticmethod
+    def _read_if_info(if_addrs: dict):
         if_w_gw = ni.gateways()['default'].get(ni.AF_INET, {1: None})[1]
-        if_data = {_if: {'ip': ni.ifaddresses(_if).get(ni.AF_INET, {0: {}})[0].get('addr'),
-                         'mac': ni.ifaddresses(_if).get(ni.AF_LINK, {0: {}})[0].get('addr'),
-                         'isgw': True if _if == if_w_gw else False} for _if in if_list
-                   if ni.ifaddresses(_if).get(ni.AF_INET, {0: {}})[0].get('addr')
+        if_data = {_if: {'ip': addrs.get(ni.AF_INET, {0: {}})[0].get('addr'),
+                         'mac': addrs.get(ni.AF_LINK, {0: {}})[0].get('addr'),
+                         'isgw': True if _if == if_w_gw else False} for _if, addrs in if_addrs.items()
+                   if addrs.get(ni.AF_INET, {0: {}})[0].get('addr')
                    }
 
         if_data['_ip_w_gw'] = if_data.get(if_w_gw, {'ip': None})['ip']
         log.debugv('[GET IFACES] Completed Iface Data: {}'.format(if_data))
         return if_data
 
-    def get_ip_list(self):
-        return [ni.ifaddresses(i).get(ni.AF_INET, {0: {}})[0].get('addr')
-                for i in ni.interfaces() if i != 'lo' and 'docker' not in i and 'ifb' not in i
-                and ni.ifaddresses(i).get(ni.AF_INET, {0: {}})[0].get('addr')]
+    @staticmethod
+    def _read_ip_list(if_addrs: dict):
+        return [addrs.get(ni.AF_INET, {0: {}})[0].get('addr') for _if, addrs in if_addrs.items()
+                if 'ifb' not in _if and addrs.get(ni.AF_INET, {0: {}})[0].get('addr')]
+
+    def start_interface_tracker(self, on_change=None) -> bool:
+        '''Keep interfaces and ip_list current from rtnetlink link/address/route notifications.
+
+        Once started get_if_info and get_ip_list are served from memory.
+
+        params:
+            on_change: optional callback, called with the new interface dict when interface data changes
+
+        returns:
+            bool: True if the tracker started, if not interface data continues to be read on demand
+        '''
+        if on_change is not None:
+            self._if_callbacks.append(on_change)
+        if self._if_watcher is None:
+            self._if_watcher = NetlinkWatcher(self.update_interfaces, name='interface_tracker')
+            if not self._if_watcher.start():
+                self._if_watcher = None
+                return False
+            self.update_interfaces()  # anything that changed between init and the watcher starting
+            self.interfaces_live = True
+            log.info('[GET IFACES] Interface tracker started, interface data will be updated on change')
+        return True
+
+    def update_interfaces(self):
+        '''Re-read interface data, calling interface tracker callbacks if it changed.
+
+        returns:
+            bool: True if interface data changed
+        '''
+        with self._if_lock:
+            if_addrs = self._read_ifaddresses()
+            interfaces, ip_list = self._read_if_info(if_addrs), self._read_ip_list(if_addrs)
+            if interfaces == self.interfaces and ip_list == self.ip_list:
+                return False
+            self.interfaces, self.ip_list = interfaces, ip_list
+
+        log.info(f'[GET IFACES] Interfaces changed: {", ".join(f"{k} {v}" for k, v in interfaces.items())}')
+        for callback in self._if_callbacks:
+            try:
+                callback(interfaces)
+            except Exception as e:
+                log.error(f'[GET IFACES] Interface change callback failed\n\t{e}')
+        return True
 
 
 if __name__ == '__main__':
@@ -0,0 +1,143 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+'''Minimal Prometheus style metrics (counters, gauges, histograms) rendered in the text exposition format.
+
+Metrics are per process, the api exposes its registry via /api/v1.0/metrics.
+
+    REQUESTS = metrics.counter('consolepi_x_total', 'help text', ['route'])
+    REQUESTS.inc(route='/api/v1.0/adapters')
+    with metrics.histogram('consolepi_x_seconds', 'help text').time():
+        ...
+'''
+
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs) -> str:
+    return '' if not pairs else '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name: str, help: str, labels: list = None):
+        self.name = name
+        self.help = help
+        self.label_names = list(labels or [])
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        '''Remove all samples (i.e. gauges rebuilt from a file on each scrape).'''
+        with self._lock:
+            self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f'{self.name} expects labels {self.label_names} got {list(labels)}')
+        return tuple(str(labels[k]) for k in self.label_names)
+
+    def _samples(self):
+        '''Return list of (suffix, label pairs, value).'''
+        with self._lock:
+            return [('', list(zip(self.label_names, k)), v) for k, v in sorted(self._values.items())]
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for suffix, pairs, value in self._samples():
+            lines.append(f'{self.name}{suffix}{_labels(pairs)} {value}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: list = None, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = sorted(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            _this = self._values.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, le in enumerate(self.buckets):
+                if value <= le:
+                    _this['buckets'][i] += 1
+            _this['sum'] += value
+            _this['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        '''Observe the time spent in the with block.'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for k, v in sorted(self._values.items()):
+                pairs = list(zip(self.label_names, k))
+                for le, count in zip(self.buckets, v['buckets']):
+                    samples.append(('_bucket', pairs + [('le', le)], count))
+                samples.append(('_bucket', pairs + [('le', '+Inf')], v['count']))
+                samples.append(('_sum', pairs, v['sum']))
+                samples.append(('_count', pairs, v['count']))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        '''Register metric, returns the existing metric if one with the same name is already registered.'''
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        return '\n'.join(m.render() for m in list(self.metrics.values())) + '\n'
+
+
+registry = Registry()
+
+
+def counter(name: str, help: str, labels: list = None) -> Counter:
+    return registry.register(Counter(name, help, labels))
+
+
+def gauge(name: str, help: str, labels: list = None) -> Gauge:
+    return registry.register(Gauge(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: list = None, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, help, labels, buckets=buckets))
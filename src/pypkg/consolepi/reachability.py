@@ -0,0 +1,192 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+import fcntl
+import json
+import os
+import threading
+import time
+
+from consolepi import utils, log  # type: ignore
+
+EWMA_ALPHA = 0.3  # weight given to the most recent latency sample
+OPEN_AFTER = 3  # consecutive failures before an IP is skipped (circuit open)
+OPEN_TIME = 300  # seconds an IP is skipped before a single retry is allowed (half-open), doubles on each failed retry
+MAX_OPEN_TIME = 3600
+PRUNE_AFTER = 7 * 86400  # entries with no activity for this long are dropped when saved
+SAVE_DELAY = 60  # seconds save_later waits, any results recorded in the meantime are written with a single save
+TRIAL_TIMEOUT = 30  # seconds a half-open trial request can go without a result before another trial is allowed
+
+
+class Scoreboard:
+    '''Persistent reachability scores for the IPs of remote ConsolePis.
+
+    Tracked for each remote/ip:
+        ewma: exponentially weighted moving average of response time (secs)
+        last_success: epoch time of last successful request
+        fails: consecutive failures
+        state: circuit breaker state closed | open
+        retry_at: epoch time an open IP is allowed a retry (half-open), a failed retry re-opens it
+    '''
+
+    def __init__(self, score_file):
+        self.score_file = score_file
+        self._lock = threading.Lock()
+        self._timer = None  # pending save_later
+        self._trials = {}  # (host, ip): epoch time the half-open trial request was admitted
+        self.data = self.load()
+
+    def load(self):
+        if self.score_file and utils.valid_file(self.score_file):
+            try:
+                with open(self.score_file) as f:
+                    return json.load(f)
+            except (ValueError, OSError) as e:
+                log.warning(f'[REACHABILITY] Unable to load {self.score_file}\n\t{e}')
+        return {}
+
+    @staticmethod
+    def merge(ours: dict, theirs: dict) -> dict:
+        '''Merge two scoreboards keeping the most recently updated entry for each host/ip.'''
+        merged = {host: dict(ips) for host, ips in theirs.items()}
+        for host, ips in ours.items():
+            for ip, v in ips.items():
+                if v.get('updated', 0) >= merged.get(host, {}).get(ip, {}).get('updated', 0):
+                    merged.setdefault(host, {})[ip] = v
+        return merged
+
+    def save(self):
+        '''Write scores to file (atomic replace), pruning stale entries.
+
+        Other processes (menu, mdns_browser) save to the same file, so what's on disk is re-read and merged
+        (newest entry for each host/ip wins) under an exclusive lock before it's replaced.
+        '''
+        if not self.score_file:
+            return
+
+        try:
+            lock_file = open(f'{self.score_file}.lock', 'a')
+        except OSError as e:
+            log.warning(f'[REACHABILITY] Unable to lock {self.score_file}, saving without merge\n\t{e}')
+            lock_file = None
+        try:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    utils.set_perm(lock_file.name)
+                except (PermissionError, KeyError):
+                    pass
+
+            now = time.time()
+            with self._lock:
+                data = self.merge(self.data, self.load()) if lock_file is not None else self.data
+                for host in list(data):
+                    data[host] = {ip: v for ip, v in data[host].items() if now - v.get('updated', 0) < PRUNE_AFTER}
+                    if not data[host]:
+                        del data[host]
+                self.data = data
+                _data = json.dumps(self.data, indent=4, sort_keys=True)
+
+            tmp_file = f'{self.score_file}.{os.getpid()}.tmp'
+            for _try in range(0, 2):
+                try:
+                    with open(tmp_file, 'w') as f:
+                        f.write(_data)
+                    os.replace(tmp_file, self.score_file)
+                    utils.set_perm(self.score_file)
+                    break
+                except PermissionError:
+                    utils.set_perm(self.score_file)
+                except OSError as e:
+                    log.warning(f'[REACHABILITY] Unable to save {self.score_file}\n\t{e}')
+                    break
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # releases the lock
+
+    def save_later(self, delay: float = SAVE_DELAY):
+        '''Save scores in delay seconds (long running processes), calls made before then do not add a write.'''
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(delay, self._timed_save)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_save(self):
+        with self._lock:
+            self._timer = None
+        self.save()
+
+    def flush(self):
+        '''Write any save pending from save_later now (i.e. on exit).'''
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save()
+
+    def get(self, host, ip):
+        return self.data.get(host, {}).get(ip, {})
+
+    def state(self, host, ip):
+        '''Return circuit breaker state for ip: closed | open | half-open (open, but retry_at has been reached).'''
+        _this = self.get(host, ip)
+        if _this.get('state', 'closed') == 'closed':
+            return 'closed'
+        return 'half-open' if time.time() >= _this.get('retry_at', 0) else 'open'
+
+    def allow(self, host, ip):
+        '''Determine if a request should be sent to ip.
+
+        A half-open ip admits a single trial request, others are refused until it records a result
+        (or TRIAL_TIMEOUT passes without one).
+        '''
+        state = self.state(host, ip)
+        if state == 'half-open':
+            now = time.time()
+            with self._lock:
+                if now - self._trials.get((host, ip), 0) < TRIAL_TIMEOUT:
+                    return False
+                self._trials[(host, ip)] = now
+            log.info(f'[REACHABILITY] {host}({ip}) retrying after {self.get(host, ip)["fails"]} consecutive failures')
+        return state != 'open'
+
+    def order(self, host, ip_list):
+        '''Return ip_list ordered by score with open circuits removed.
+
+        IPs with no failures come first.  Of those, IPs with a latency history are ordered fastest first within the
+        positions they hold in ip_list, IPs with no history are neutral and keep their position (callers preference).
+        IPs with failures follow, fewest failures first.
+        '''
+        allowed = [ip for ip in ip_list if self.allow(host, ip)]
+        for ip in ip_list:
+            if ip not in allowed:
+                log.debug(f'[REACHABILITY] skipping {host}({ip}) {self.get(host, ip).get("fails")} consecutive failures')
+
+        healthy = [ip for ip in allowed if not self.get(host, ip).get('fails')]
+        scored = iter(sorted([ip for ip in healthy if 'ewma' in self.get(host, ip)], key=lambda ip: self.get(host, ip)['ewma']))
+        failing = sorted([ip for ip in allowed if ip not in healthy], key=lambda ip: self.get(host, ip)['fails'])
+        return [next(scored) if 'ewma' in self.get(host, ip) else ip for ip in healthy] + failing
+
+    def record(self, host, ip, ok: bool, elapsed: float = None):
+        '''Record the result of a request to ip.'''
+        now = time.time()
+        with self._lock:
+            self._trials.pop((host, ip), None)
+            _this = self.data.setdefault(host, {}).setdefault(ip, {'fails': 0, 'state': 'closed'})
+            _this['updated'] = now
+            if ok:
+                if elapsed is not None:
+                    _this['ewma'] = elapsed if 'ewma' not in _this else \
+                        EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * _this['ewma']
+                _this['last_success'] = now
+                _this['fails'] = 0
+                _this['state'] = 'closed'
+                _this.pop('retry_at', None)
+            else:
+                _this['fails'] += 1
+                if _this['fails'] >= OPEN_AFTER:
+                    open_time = min(OPEN_TIME * 2 ** max(_this['fails'] - OPEN_AFTER, 0), MAX_OPEN_TIME)
+                    _this['state'] = 'open'
+                    _this['retry_at'] = now + open_time
+                    log.info(f'[REACHABILITY] {host}({ip}) {_this["fails"]} consecutive failures, '
+                             f'skipping for {open_time} seconds')
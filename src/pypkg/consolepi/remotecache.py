@@ -0,0 +1,243 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from consolepi import utils, log  # type: ignore
+from consolepi.watch import FileWatcher  # type: ignore
+
+BUSY_TIMEOUT = 5  # seconds a writer waits on another writers lock before giving up
+
+
+class RemoteCache:
+    '''Local cloud cache.  Data for each remote ConsolePi is stored as a row in an SQLite db (WAL mode).
+
+    Writers upsert/delete individual remotes in a single short transaction, so concurrent writers
+    (menu, mdns_browser, mdns_register, api) no longer overwrite each others updates, and readers never
+    see a partially written cache.  A single remote can be read without loading the whole cache.
+
+    The legacy cloud.json (if present) is imported the first time the db is created.
+    '''
+
+    def __init__(self, db_file, legacy_file=None):
+        self.db_file = db_file
+        self.legacy_file = legacy_file
+        self._local = threading.local()  # sqlite connections can not be shared across threads
+        self.watchers = []  # RemoteCacheWatchers refreshed after each write from this process
+        self._init_db()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._set_perms()  # -wal/-shm are (re)created on open, the non-root menu/api users need group write
+        return conn
+
+    def _set_perms(self):
+        for f in [self.db_file, f'{self.db_file}-wal', f'{self.db_file}-shm']:
+            if os.path.isfile(f):
+                try:
+                    utils.set_perm(f)
+                except (PermissionError, KeyError):
+                    pass
+
+    def _init_db(self):
+        new_db = not os.path.isfile(self.db_file)
+        try:
+            conn = self._connect()
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS remotes ('
+                'host TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)'
+            )
+            # seq: incremented by each write, rows carry the seq of the write that last changed them
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            if 'seq' not in [c[1] for c in conn.execute('PRAGMA table_info(remotes)')]:
+                conn.execute('ALTER TABLE remotes ADD COLUMN seq INTEGER NOT NULL DEFAULT 0')
+        except sqlite3.Error as e:
+            log.error(f'[CACHE] Unable to open local cloud cache {self.db_file}\n\t{e}')
+            return
+
+        if new_db:
+            if self.legacy_file and utils.valid_file(self.legacy_file):
+                try:
+                    with open(self.legacy_file) as f:
+                        legacy = json.load(f)
+                    if legacy:
+                        self.upsert(legacy)
+                        log.info(f'[CACHE] Imported {len(legacy)} remotes from {self.legacy_file}')
+                except (ValueError, OSError) as e:
+                    log.warning(f'[CACHE] Unable to import {self.legacy_file}\n\t{e}')
+
+    def get(self, host=None):
+        '''Return cached remote data.
+
+        params:
+            host(str): return data for a single remote, all remotes if not provided
+
+        returns:
+            dict: {hostname: data} for all remotes, or data for host (None if host not in cache)
+        '''
+        try:
+            conn = self._connect()
+            if host:
+                row = conn.execute('SELECT data FROM remotes WHERE host = ?', (host,)).fetchone()
+                return None if row is None else json.loads(row[0])
+            return {h: json.loads(d) for h, d in conn.execute('SELECT host, data FROM remotes ORDER BY host')}
+        except sqlite3.Error as e:
+            log.error(f'[CACHE] Unable to read local cloud cache {self.db_file}\n\t{e}')
+            return None if host else {}
+
+    def seq(self):
+        '''Return the current write seq, incremented by each write from any connection.'''
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+        return 0 if row is None else row[0]
+
+    def get_changed(self, since: int = 0):
+        '''Return current hostnames and data for remotes changed after write seq since.
+
+        params:
+            since(int): seq returned by previous call, 0 returns all remotes
+
+        returns:
+            tuple: (list of all hostnames, {hostname: data} of changed remotes, current seq)
+        '''
+        conn = self._connect()
+        conn.execute('BEGIN')  # single read snapshot
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+            hosts = [r[0] for r in conn.execute('SELECT host FROM remotes')]
+            changed = {h: json.loads(d) for h, d in conn.execute('SELECT host, data FROM remotes WHERE seq > ?', (since,))}
+        finally:
+            conn.execute('COMMIT')
+        return hosts, changed, 0 if row is None else row[0]
+
+    def hosts(self):
+        '''Return list of hostnames in cache.'''
+        try:
+            return [r[0] for r in self._connect().execute('SELECT host FROM remotes ORDER BY host')]
+        except sqlite3.Error as e:
+            log.error(f'[CACHE] Unable to read local cloud cache {self.db_file}\n\t{e}')
+            return []
+
+    def upsert(self, remotes: dict, delete: list = None):
+        '''Insert/Update remotes and delete remotes in a single transaction.
+
+        Rows are only re-written if the data for that remote changed.
+
+        params:
+            remotes(dict): {hostname: data} for each remote to insert/update
+            delete(list): hostnames to remove from the cache
+
+        returns:
+            bool: True if the transaction was committed
+        '''
+        delete = delete or []
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('seq', 1) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+                )
+                seq = conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0]
+                conn.executemany(
+                    'INSERT INTO remotes (host, data, updated, seq) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT(host) DO UPDATE SET data = excluded.data, updated = excluded.updated, seq = excluded.seq '
+                    'WHERE remotes.data != excluded.data',
+                    [(h, json.dumps(d, sort_keys=True), now, seq) for h, d in remotes.items()]
+                )
+                deleted = [h for h in delete if conn.execute('DELETE FROM remotes WHERE host = ?', (h,)).rowcount]
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            log.error(f'[CACHE] Unable to update local cloud cache {self.db_file}\n\t{e}')
+            return False
+
+        if deleted:
+            log.info(f'[CACHE] Removed {", ".join(deleted)} from local cloud cache')
+        # a read right after a write from this process should not wait on inotify to see it
+        for watcher in self.watchers:
+            watcher.refresh()
+        return True
+
+    def delete(self, host):
+        '''Remove a remote from the cache.'''
+        return self.upsert({}, delete=[host])
+
+
+class RemoteCacheWatcher:
+    '''In memory snapshot of the local cloud cache for long running processes.
+
+    The snapshot is only reloaded when the cache db changes (inotify on the db and its WAL), and only rows
+    updated since the last reload are parsed.  version is incremented each time the remote data changes.
+    Falls back to checking the cache write seq on each access if inotify is not available.
+    '''
+
+    def __init__(self, cache: RemoteCache):
+        self.cache = cache
+        self.version = 0
+        self.data = {}
+        self._since = 0  # write seq the snapshot is current as of
+        self._lock = threading.Lock()
+        self._watching = None  # None: not started, False: inotify not available
+        self._watcher = FileWatcher(
+            [cache.db_file, f'{cache.db_file}-wal'], lambda paths: self.refresh(), name='remote_cache_watcher'
+        )
+        cache.watchers.append(self)
+
+    def start(self):
+        '''Load the initial snapshot and start the inotify watcher thread.'''
+        self.refresh()
+        if self._watching is None:
+            self._watching = self._watcher.start()
+            if not self._watching:
+                log.warning('[CACHE WATCH] cache will be checked for changes on access')
+
+    def refresh(self):
+        '''Reload changed remotes from the cache db if it was written since the last reload.
+
+        returns:
+            bool: True if the snapshot changed
+        '''
+        with self._lock:
+            try:
+                if self.cache.seq() == self._since:
+                    return False
+                hosts, changed, self._since = self.cache.get_changed(self._since)
+            except sqlite3.Error as e:
+                log.error(f'[CACHE WATCH] Unable to read local cloud cache {self.cache.db_file}\n\t{e}')
+                return False
+
+            data = {h: self.data[h] for h in hosts if h in self.data}
+            data.update(changed)
+            if data == self.data:
+                return False
+
+            log.debug(f'[CACHE WATCH] local cloud cache changed, {len(changed)} remotes updated, '
+                      f'{len(set(self.data) - set(hosts))} removed')
+            self.data = data
+            self.version += 1
+            return True
+
+    def snapshot(self):
+        '''Return (version, data) for the current snapshot.  data is shared, treat as read only.'''
+        if self._watching is None:
+            self.start()
+        elif not self._watching:
+            self.refresh()
+        return self.version, self.data
+
+    def get(self):
+        '''Return a copy of the current remote data that the caller can modify.'''
+        return copy.deepcopy(self.snapshot()[1])
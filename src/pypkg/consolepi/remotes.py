@@ -1,21 +1,41 @@
 #!/etc/ConsolePi/venv/bin/python3
 
+import asyncio
+import copy
 import time
-import threading
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from halo import Halo
 from sys import stdin
 from log_symbols import LogSymbols as log_sym  # Enum
-from consolepi import utils, log, config, json, requests
+from consolepi import utils, log, config, json, api_client, metrics
+from consolepi.reachability import Scoreboard
+try:
+    import msgpack  # optional, remotes that support it return adapters msgpack encoded (smaller/faster to parse)
+except ImportError:
+    msgpack = None
 # from consolepi.gdrive import GoogleDrive  !!--> Import burried in refresh method to speed menu load times on older platforms
 
+IP_RACE_STAGGER = 0.25  # delay before starting the request to the next candidate IP for a remote
+VERIFY_TIME = metrics.histogram(
+    "consolepi_remote_verify_seconds", "Outbound API request latency verifying remote ConsolePis", ["result"]
+)
+
 
 class Remotes:
     """Remotes Object Contains attributes for discovered remote ConsolePis"""
 
-    def __init__(self, local, cpiexec):
+    def __init__(self, local, cpiexec, background=False):
         self.cpiexec = cpiexec
         self.pop_list = []
+        self.pending = []  # remotes not yet verified (background) or that did not complete before remote_verify_deadline
+        self.version = 0  # incremented as background verification updates data, allows menu to repaint
+        self.revalidate_thread = None
+        self.api_versions = {}  # ETag and generation of last adapters response by ip
+        self.api_sections = {}  # other sections (interfaces) from the last snapshot response by ip
+        self.snapshot_unsupported = set()  # ips of remotes running an older api without /snapshot
+        self.scoreboard = Scoreboard(config.static.get("REACHABILITY_FILE", "/etc/ConsolePi/reachability.json"))
         self.old_api_log_sent = False
         self.log_sym_warn = log_sym.WARNING.value
         self.log_sym_error = log_sym.ERROR.value
@@ -39,9 +59,41 @@ class Remotes:
                     show=True,
                 )
                 self.local_only = True
-        self.data = self.get_remote(
-            data=config.remote_update()
-        )  # re-get cloud.json to capture any updates via mdns
+        if background:
+            # -- // stale-while-revalidate: use cached data now, verify remotes in the background \\ --
+            _data = config.remote_update() or {}
+            self.data = {k: v for k, v in _data.items() if k != socket.gethostname()}
+            self.pending = list(self.data)
+            self.revalidate_thread = threading.Thread(
+                target=self.revalidate, args=(_data,), name="remotes_revalidate"
+            )
+            self.revalidate_thread.start()
+        else:
+            self.data = self.get_remote(
+                data=config.remote_update()
+            )  # re-get cloud.json to capture any updates via mdns
+
+    def revalidate(self, data):
+        """Verify remotes in the background, updating self.data as each result arrives.
+
+        params:
+            data: dict remote ConsolePi dict with hostname as key (from local cloud cache)
+        """
+        self.data = self.get_remote(data=data, background=True)
+        self.version += 1
+
+    def wait_for_revalidate(self):
+        """Block until background verification (if running) completes."""
+        if self.revalidate_thread is not None and self.revalidate_thread.is_alive() \
+                and threading.current_thread() is not self.revalidate_thread:
+            with Halo(text="Waiting for background verification of remotes to complete", spinner="dots1"):
+                self.revalidate_thread.join()
+
+    def update_remote(self, remotepi, this):
+        """Update data for a single remote as its verification completes (background verification)."""
+        if remotepi in self.data:  # Only existing keys are updated, menu may be iterating over data
+            self.data[remotepi] = this
+        self.version += 1
 
     def no_creds_error(self):
         cloud_svc = config.cfg.get("cloud_svc", "UNDEFINED!")
@@ -53,41 +105,10 @@ class Remotes:
         self.do_cloud = config.cfg["do_cloud"] = False
 
     # get remote consoles from local cache refresh function will check/update cloud file and update local cache
-    def get_remote(self, data=None, rename=False):
+    def get_remote(self, data=None, rename=False, background=False):
         spin = self.spin
-
-        def verify_remote_thread(remotepi, data, rename):
-            """sub to verify reachability and api data for remotes
-
-            params:
-            remotepi: The hostname currently being processed
-            data: dict remote ConsolePi dict with hostname as key
-            """
-            this = data[remotepi]
-            res = self.api_reachable(remotepi, this, rename=rename)
-            this = res.data
-            if res.update:
-                self.cache_update_pending = True
-
-            if not res.reachable:
-                log.warning(
-                    f"[GET REM] Found {remotepi} in Local Cloud Cache: UNREACHABLE"
-                )
-                this["fail_cnt"] = (
-                    1 if not this.get("fail_cnt") else this["fail_cnt"] + 1
-                )
-                self.pop_list.append(remotepi)
-                self.cache_update_pending = True
-            else:
-                self.connected = True
-                if this.get("fail_cnt"):
-                    this["fail_cnt"] = 0
-                    self.cache_update_pending = True
-                if res.update:
-                    log.info(f"[GET REM] Updating Cache - Found {remotepi} in Local Cloud Cache, "
-                             f"reachable via {this['rem_ip']}")
-
-            data[remotepi] = this
+        do_spin = stdin.isatty() and not background
+        self.wait_for_revalidate()
 
         if data is None or len(data) == 0:
             data = config.remotes  # remotes from local cloud cache
@@ -96,6 +117,7 @@ class Remotes:
             # print(self.log_sym_warn + " No Remotes in Local Cache")
             log.info("No Remotes found in Local Cache")
             data = {}  # convert None type to empy dict
+            self.pending = []
         else:
             # if self is in the remote-data remove and warn user (can occur in rare scenarios i.e. hostname changes)
             if socket.gethostname() in data:
@@ -105,39 +127,38 @@ class Remotes:
                 )
 
             # Verify Remote ConsolePi details and reachability
-            if stdin.isatty():
+            if do_spin:
                 spin.start(
                     "Querying Remotes via API to verify reachability and adapter data"
                 )
-            for remotepi in data:
-                # -- // Launch Threads to verify all remotes in parallel \\ --
-                threading.Thread(
-                    target=verify_remote_thread,
-                    args=(remotepi, data, rename),
-                    name=f"vrfy_{remotepi}",
-                ).start()
-                # verify_remote_thread(remotepi, data)  # Non-Threading DEBUG
-
-            # -- wait for threads to complete --
-            if not self.cpiexec.wait_for_threads(name="vrfy_", thread_type="remote"):
+
+            # -- // Verify all remotes concurrently, bounded by remote_verify_workers / remote_verify_deadline \\ --
+            self.pending = self.verify_remotes(data, rename=rename, on_result=None if not background else self.update_remote)
+            self.scoreboard.save()
+
+            if not self.pending:
                 if config.remotes:
-                    if stdin.isatty():
+                    if do_spin:
                         spin.succeed(
                             "[GET REM] Querying Remotes via API to verify reachability and adapter data\n\t"
                             f"Found {len(config.remotes)} Remote ConsolePis"
                         )
                 else:
-                    if stdin.isatty():
+                    if do_spin:
                         spin.warn(
                             "[GET REM] Querying Remotes via API to verify reachability and adapter data\n\t"
                             "No Reachable Remote ConsolePis Discovered"
                         )
             else:
-                log.error(
-                    "[GET REM] Remote verify threads Still running / exceeded timeout"
+                log.warning(
+                    f"[GET REM] Verification of {len(self.pending)} Remote(s) exceeded {config.remote_verify_deadline}s "
+                    f"deadline, using cached data: {', '.join(self.pending)}"
                 )
-                if stdin.isatty():
-                    spin.stop()
+                if do_spin:
+                    spin.warn(
+                        "[GET REM] Querying Remotes via API to verify reachability and adapter data\n\t"
+                        f"{len(self.pending)} Remote ConsolePis still pending verification"
+                    )
 
         # update local cache if any ConsolePis found UnReachable
         if self.cache_update_pending:
@@ -163,12 +184,96 @@ class Remotes:
 
         return data
 
+    def verify_remotes(self, data: dict, rename: bool = False, on_result=None):
+        """Verify reachability and api data for all remotes concurrently.
+
+        Each remote is verified via api_reachable in an asyncio task, with at most
+        config.remote_verify_workers verifications in flight.  Remotes that have not
+        completed by config.remote_verify_deadline are left as they are in the cache
+        and returned as pending, so a few slow remotes don't block the menu.
+
+        params:
+            data: dict remote ConsolePi dict with hostname as key (updated in place)
+            rename: bool, passed to api_reachable
+            on_result: callable, called with hostname and updated data for each remote as it completes
+
+        returns:
+            list: hostnames of remotes still pending verification when the deadline expired
+        """
+        def process_result(remotepi, res):
+            this = res.data
+            if res.update:
+                self.cache_update_pending = True
+
+            if not res.reachable:
+                log.warning(
+                    f"[GET REM] Found {remotepi} in Local Cloud Cache: UNREACHABLE"
+                )
+                this["fail_cnt"] = (
+                    1 if not this.get("fail_cnt") else this["fail_cnt"] + 1
+                )
+                self.pop_list.append(remotepi)
+                self.cache_update_pending = True
+            else:
+                self.connected = True
+                if this.get("fail_cnt"):
+                    this["fail_cnt"] = 0
+                    self.cache_update_pending = True
+                if res.update:
+                    log.info(f"[GET REM] Updating Cache - Found {remotepi} in Local Cloud Cache, "
+                             f"reachable via {this['rem_ip']}")
+
+            data[remotepi] = this
+            if remotepi in self.pending:
+                self.pending.remove(remotepi)
+            if on_result is not None:
+                on_result(remotepi, this)
+
+        async def verify_all(executor):
+            loop = asyncio.get_event_loop()
+            sem = asyncio.Semaphore(config.remote_verify_workers)
+
+            async def verify_remote(remotepi):
+                async with sem:
+                    # api_reachable works on a copy so a laggard finishing after the deadline can't modify data
+                    res = await loop.run_in_executor(
+                        executor, self.api_reachable, remotepi, copy.deepcopy(data[remotepi]), rename
+                    )
+                process_result(remotepi, res)
+
+            tasks = {asyncio.ensure_future(verify_remote(r)): r for r in data}
+            _, not_done = await asyncio.wait(list(tasks), timeout=config.remote_verify_deadline)
+            for t in not_done:
+                t.cancel()
+
+            return [tasks[t] for t in not_done]
+
+        start = time.time()
+        executor = ThreadPoolExecutor(max_workers=config.remote_verify_workers, thread_name_prefix="vrfy")
+        loop = asyncio.new_event_loop()
+        try:
+            pending = loop.run_until_complete(verify_all(executor))
+        finally:
+            loop.close()
+            executor.shutdown(wait=False)
+
+        log.info(
+            f"[GET REM] Verified {len(data) - len(pending)} of {len(data)} Remotes, elapsed time: {time.time() - start}"
+        )
+        _stats = api_client.stats()
+        log.debug(
+            f"[GET REM] API client: {_stats['requests']} requests, {_stats['connections']} new connections, "
+            f"{_stats['reused']} reused, avg handshake {_stats['avg_handshake'] * 1000:.1f}ms"
+        )
+        return pending
+
     # Update with Data from ConsolePi.csv on Gdrive and local cache populated by mdns.  Update Gdrive with our data
     def refresh(self, bypass_cloud=False):
         remote_consoles = None
         cpiexec = self.cpiexec
         local = self.local
         cloud_svc = config.cfg.get("cloud_svc", "error")
+        self.wait_for_revalidate()
 
         # TODO refactor wait_for_threads to have an all key or accept a list
         with Halo(text="Waiting For threads to complete", spinner="dots1"):
@@ -201,11 +306,23 @@ class Remotes:
             if stdin.isatty():
                 self.spin.start(_msg)
             # -- // SYNC DATA WITH GDRIVE \\ --
-            remote_consoles = self.cloud.update_files(
-                local.data
-            )  # local data refreshed above
-            if remote_consoles and "Gdrive-Error:" not in remote_consoles:
+            # local data refreshed above, only pushed if it changed since the last push
+            _hash = local.hash
+            remote_consoles = self.cloud.update_files(local.data, push=not local.is_published("cloud"))
+            if "Gdrive-Error:" in remote_consoles:
                 if stdin.isatty():
+                    self.spin.fail(
+                        "{}\n\t{} {}".format(_msg, self.log_sym_error, remote_consoles)
+                    )
+                log.show(remote_consoles)  # display error returned from gdrive module
+                remote_consoles = []
+            else:
+                # the push succeeded, whether or not any remotes were found
+                local.set_published("cloud", _hash)
+                if not remote_consoles:
+                    if stdin.isatty():
+                        self.spin.warn(_msg + "\n\tNo Remotes Found via Gdrive Sync")
+                elif stdin.isatty():
                     self.spin.succeed(_msg + "\n\tFound {} Remotes via Gdrive Sync".format(
                             len(remote_consoles)
                         )
@@ -219,16 +336,6 @@ class Remotes:
                             log.warning(
                                 f"Adapter data for {r} retrieved from cloud in old API format... Converted"
                             )
-            elif "Gdrive-Error:" in remote_consoles:
-                if stdin.isatty():
-                    self.spin.fail(
-                        "{}\n\t{} {}".format(_msg, self.log_sym_error, remote_consoles)
-                    )
-                log.show(remote_consoles)  # display error returned from gdrive module
-                remote_consoles = []
-            else:
-                if stdin.isatty():
-                    self.spin.warn(_msg + "\n\tNo Remotes Found via Gdrive Sync")
 
             if len(remote_consoles) > 0:
                 _msg = f"[MENU REFRESH] Updating Local Cache with data from {cloud_svc}"
@@ -253,29 +360,21 @@ class Remotes:
         # Update Remote data with data from local_cloud cache / cloud
         self.data = self.get_remote(data=remote_consoles)
 
-    def update_local_cloud_file(
-        self, remote_consoles=None, current_remotes=None, local_cloud_file=None
-    ):
-        """Update local cloud cache (cloud.json).
+    def update_local_cloud_file(self, remote_consoles=None, current_remotes=None):
+        """Update local cloud cache (cloud.db).
 
-        Verifies the newly discovered data is more current than what we already know and updates the local cloud.json file if so
-        The Menu uses cloud.json to populate remote menu items
+        Verifies the newly discovered data is more current than what we already know and updates the local cloud cache if so
+        Only remotes that changed are written, remotes in current_remotes that are dropped from the result are removed.
+        The Menu uses the local cloud cache to populate remote menu items
 
         params:
             remote_consoles: The newly discovered data (from Gdrive or mdns)
-            current_remotes: The current remote data fetched from the local cloud cache (cloud.json)
+            current_remotes: The current remote data fetched from the local cloud cache
                 - func will retrieve this if not provided
-            local_cloud_file The path to the local cloud file (global var cloud.json)
 
         returns:
         dict: The resulting remote console dict representing the most recent data for each remote.
         """
-        local_cloud_file = (
-            config.static.get("LOCAL_CLOUD_FILE")
-            if local_cloud_file is None
-            else local_cloud_file
-        )
-
         if len(remote_consoles) > 0:
             if current_remotes is None:
                 current_remotes = self.data = config.remote_update()  # grabs the remote data from local cloud cache
@@ -396,18 +495,10 @@ class Remotes:
                                     )
                                 )
 
-            for _try in range(0, 2):
-                try:
-                    with open(local_cloud_file, "w") as cloud_file:
-                        cloud_file.write(
-                            json.dumps(remote_consoles, indent=4, sort_keys=True)
-                        )
-                        utils.set_perm(
-                            local_cloud_file
-                        )  # a hack to deal with perms ~ consolepi-details del func
-                        break
-                except PermissionError:
-                    utils.set_perm(local_cloud_file)
+            config.cloud_cache.upsert(
+                remote_consoles,
+                delete=[r for r in current_remotes or {} if r not in remote_consoles]
+            )
 
         else:
             log.warning(
@@ -440,7 +531,7 @@ class Remotes:
         }
 
         try:
-            response = requests.request(
+            response = api_client.request(
                 "GET", url, headers=headers, timeout=config.remote_timeout
             )
         except (OSError, TimeoutError):
@@ -455,43 +546,86 @@ class Remotes:
 
         return response
 
-    def get_adapters_via_api(self, ip: str, rename: bool = False, log_host: str = None):
+    def get_adapters_via_api(self, ip: str, rename: bool = False, log_host: str = None, etag: str = None,
+                             since: int = None, cached: dict = None):
         """Send RestFul GET request to Remote ConsolePi to collect adapter info
 
         params:
         ip(str): ip address or FQDN of remote ConsolePi
         rename(bool): TODO
         log_host(str): friendly string for logging purposes "hostname(ip)"
+        etag(str): ETag from a previous response, sent as If-None-Match
+        since(int): generation from a previous response, remote returns only adapters changed since
+        cached(dict): The cached adapter data for generation since, delta responses are applied to it
 
         returns:
-        adapter dict for remote if successful and adapters exist
+        adapter dict for remote if successful and adapters exist (ETag and generation from the response
+            are stored in api_versions)
+        status_code 304 if etag was provided and adapters are unchanged
         status_code 200 if successful but no adapters or Falsey or response status_code if an error occurred.
         """
         if not log_host:
             log_host = ip
-        url = f"http://{ip}:5000/api/v1.0/adapters"
+        # snapshot returns adapters and interfaces in 1 request, falls back to adapters for older remotes
+        use_snapshot = ip not in self.snapshot_unsupported
+        url = f"http://{ip}:5000/api/v1.0/{'snapshot' if use_snapshot else 'adapters'}"
+        params = {} if not use_snapshot else {"sections": "adapters,interfaces"}
         if rename:
-            url = f"{url}?refresh=true"
+            params["refresh"] = "true"
+        if since is not None and cached is not None:
+            params["since"] = since
 
-        log.debug(url)
+        log.debug(f"{url} {params}")
 
         headers = {
-            "Accept": "*/*",
+            "Accept": "*/*" if not msgpack else "application/msgpack, application/json;q=0.9",
             "Cache-Control": "no-cache",
             "Host": f"{ip}:5000",
             "accept-encoding": "gzip, deflate",
             "Connection": "keep-alive",
             "cache-control": "no-cache",
         }
+        if etag:
+            headers["If-None-Match"] = etag
 
         try:
-            response = requests.request("GET", url, headers=headers, timeout=config.remote_timeout)
+            response = api_client.request("GET", url, headers=headers, params=params, timeout=config.remote_timeout)
         except (OSError, TimeoutError):
             log.warning(f"[API RQST OUT] Remote ConsolePi: {log_host} TimeOut when querying via API - Unreachable.")
             return False
 
-        if response.ok:
-            ret = response.json()
+        if response.status_code == 404 and use_snapshot:
+            log.info(f"[API RQST OUT] Remote ConsolePi: {log_host} does not support snapshot, using adapters")
+            self.snapshot_unsupported.add(ip)
+            return self.get_adapters_via_api(ip, rename=rename, log_host=log_host, etag=etag, since=since, cached=cached)
+
+        if response.status_code == 304:
+            ret = response.status_code
+            log.info(f"[API RQST OUT] Adapters unchanged for Remote ConsolePi: {log_host}")
+        elif response.ok:
+            if msgpack and response.headers.get("Content-Type", "").startswith("application/msgpack"):
+                ret = msgpack.unpackb(response.content)
+            else:
+                ret = response.json()
+            if use_snapshot:
+                # -- snapshot response: {section: {data, generation, updated}}, adapters are handled as /adapters --
+                self.api_sections[ip] = {k: v for k, v in ret.items() if k not in ["hostname", "adapters"]}
+                _this = ret["adapters"]
+                ret = {
+                    "adapters": _this["data"],
+                    "generation": _this["generation"],
+                    "delta": _this.get("delta"),
+                    "removed": _this.get("removed", []),
+                }
+            self.api_versions[ip] = {"etag": response.headers.get("ETag"), "generation": ret.get("generation")}
+            if ret.get("delta"):
+                # -- delta response: apply changed and removed adapters to the cached data --
+                log.debug(f"[API RQST OUT] {log_host} returned {len(ret['adapters'])} changed, "
+                          f"{len(ret.get('removed', []))} removed adapters since generation {since}")
+                ret["adapters"] = {
+                    **{a: cached[a] for a in cached if a not in ret.get("removed", [])},
+                    **ret["adapters"]
+                }
             ret = ret["adapters"] if ret["adapters"] else response.status_code
             _msg = f"Adapters Successfully retrieved via API for Remote ConsolePi: {log_host}"
             log.info("[API RQST OUT] {}".format(_msg))
@@ -507,6 +641,71 @@ class Remotes:
             )
         return ret
 
+    def probe_ip(self, remote_host: str, ip: str, **kwargs):
+        """Fetch adapters from ip via get_adapters_via_api recording the result in the reachability scoreboard.
+
+        params:
+            remote_host(str): The hostname of the Remote ConsolePi
+            ip(str): The ip to query
+            kwargs: passed to get_adapters_via_api
+
+        returns:
+            return from get_adapters_via_api
+        """
+        start = time.time()
+        _adapters = self.get_adapters_via_api(ip, log_host=f"{remote_host}({ip})", **kwargs)
+        elapsed = time.time() - start
+        self.scoreboard.record(remote_host, ip, ok=bool(_adapters), elapsed=elapsed)
+        VERIFY_TIME.observe(elapsed, result="ok" if _adapters else "fail")
+        return _adapters
+
+    def race_adapters_via_api(self, remote_host: str, ip_list: list, **kwargs):
+        """Query candidate IPs for a remote concurrently, the first IP to answer wins.
+
+        Requests are started in list order (preferred IPs first), each subsequent IP is
+        started IP_RACE_STAGGER seconds after the previous one, or immediately if the
+        previous one fails.  Once an IP answers no further requests are started and the
+        results of any still in flight are discarded.
+
+        params:
+            remote_host(str): The hostname of the Remote ConsolePi (for logging)
+            ip_list(list): candidate IPs in order of preference
+            kwargs: passed to get_adapters_via_api via probe_ip (rename, etag, since, cached)
+
+        returns:
+            tuple: (ip, adapters) ip that answered (None if none did), and the
+                   return from get_adapters_via_api for that ip (False if none did).
+        """
+        if len(ip_list) <= 1:
+            _ip = None if not ip_list else ip_list[0]
+            _adapters = False if not _ip else self.probe_ip(remote_host, _ip, **kwargs)
+            return (_ip, _adapters) if _adapters else (None, _adapters)
+
+        remaining = list(ip_list)
+        futures = {}
+        executor = ThreadPoolExecutor(max_workers=len(ip_list), thread_name_prefix=f"race_{remote_host}")
+        try:
+            while remaining or futures:
+                if remaining:
+                    _ip = remaining.pop(0)
+                    futures[
+                        executor.submit(self.probe_ip, remote_host, _ip, **kwargs)
+                    ] = _ip
+
+                done, _ = wait(futures, timeout=IP_RACE_STAGGER if remaining else None, return_when=FIRST_COMPLETED)
+                for f in sorted(done, key=lambda f: ip_list.index(futures[f])):
+                    _ip = futures.pop(f)
+                    _adapters = f.result()
+                    if _adapters:
+                        for _f in futures:
+                            _f.cancel()
+                        log.debug(f"[API_REACHABLE] {remote_host} answered first via {_ip}")
+                        return _ip, _adapters
+        finally:
+            executor.shutdown(wait=False)
+
+        return None, False
+
     def api_reachable(self, remote_host: str, cache_data: dict, rename: bool = False):
         """Check Rechability & Fetch adapter data via API for remote ConsolePi
 
@@ -543,48 +742,71 @@ class Remotes:
         for _ip in [cache_data.get("rem_ip"), cache_data.get("last_ip")]:
             if _ip:
                 if _ip not in rem_ip_list or rem_ip_list.index(_ip) != 0:
-                    rem_ip_list.remove(_ip)
+                    if _ip in rem_ip_list:
+                        rem_ip_list.remove(_ip)
                     rem_ip_list.insert(0, _ip)
 
-        rem_ip = None
+        # order by reachability score, skipping IPs that are known to be unreachable (until their retry time)
+        rem_ip_list = self.scoreboard.order(remote_host, rem_ip_list)
+
+        # only send the ETag / generation if we have the adapter data they represent
+        cached = None if not isinstance(cache_data.get("adapters"), dict) else cache_data["adapters"]
+        etag = None if cached is None else cache_data.get("adapters_etag")
+        since = None if cached is None else cache_data.get("adapters_gen")
+
+        log.debug(f"[API_REACHABLE] verifying {remote_host}")
+        rem_ip, _adapters = self.race_adapters_via_api(
+            remote_host, rem_ip_list, rename=rename, etag=etag, since=since, cached=cached
+        )
+        _sections = self.api_sections.get(rem_ip, {})
         for _ip in rem_ip_list:
-            log.debug(f"[API_REACHABLE] verifying {remote_host}")
-            _adapters = self.get_adapters_via_api(_ip, rename=rename, log_host=f"{remote_host}({_ip})")
-            if _adapters:
-                rem_ip = _ip  # Remote is reachable
-                if not isinstance(_adapters, int):  # indicates status_code returned (error or no adapters found)
-                    if isinstance(_adapters, list):  # indicates need for conversion from old api format
-                        _adapters = self.convert_adapters(_adapters)
-                        if not self.old_api_log_sent:
-                            log.warning(
-                                f"{remote_host} provided old api schema.  Recommend Upgrading to current."
-                            )
-                            self.old_api_log_sent = True
-                    # Only compare config dict for each adapter as udev dict will generally be different due to time_since_init
-                    if not cache_data.get("adapters") or {
-                        a: {"config": _adapters[a].get("config", {})} for a in _adapters
-                    } != {
-                        a: {"config": cache_data["adapters"][a].get("config", {})}
-                        for a in cache_data["adapters"]
-                    }:
+            self.api_sections.pop(_ip, None)
+        if _adapters:
+            if not isinstance(_adapters, int):  # indicates status_code returned (error or no adapters found)
+                if isinstance(_adapters, list):  # indicates need for conversion from old api format
+                    _adapters = self.convert_adapters(_adapters)
+                    if not self.old_api_log_sent:
+                        log.warning(
+                            f"{remote_host} provided old api schema.  Recommend Upgrading to current."
+                        )
+                        self.old_api_log_sent = True
+                # Only compare config dict for each adapter as udev dict will generally be different due to time_since_init
+                if not cache_data.get("adapters") or {
+                    a: {"config": _adapters[a].get("config", {})} for a in _adapters
+                } != {
+                    a: {"config": cache_data["adapters"][a].get("config", {})}
+                    for a in cache_data["adapters"]
+                }:
+                    cache_data["adapters"] = _adapters
+                    update = True  # --> Update if adapter dict is different
+                else:
+                    cached_udev = [False for a in cache_data["adapters"] if 'udev' not in cache_data["adapters"][a]]
+                    if False in cached_udev:
                         cache_data["adapters"] = _adapters
-                        update = True  # --> Update if adapter dict is different
-                    else:
-                        cached_udev = [False for a in cache_data["adapters"] if 'udev' not in cache_data["adapters"][a]]
-                        if False in cached_udev:
-                            cache_data["adapters"] = _adapters
-                            update = True  # --> Update if udev key not in existing data (udev not sent to cloud)
-                elif _adapters == 200:
-                    log.show(
-                        f"Remote {remote_host} is reachable via {_ip},"
-                        " but has no adapters attached\nit's still available in remote shell menu"
-                    )
+                        update = True  # --> Update if udev key not in existing data (udev not sent to cloud)
+
+                _version = self.api_versions.get(rem_ip, {})
+                if _version.get("etag") != cache_data.get("adapters_etag") or \
+                        _version.get("generation") != cache_data.get("adapters_gen"):
+                    cache_data["adapters"] = _adapters
+                    cache_data["adapters_etag"] = _version.get("etag")
+                    cache_data["adapters_gen"] = _version.get("generation")
+                    update = True  # --> Update so cached ETag / generation always match cached adapter data
+
+                _interfaces = _sections.get("interfaces", {}).get("data")
+                if _interfaces and _interfaces != cache_data.get("interfaces"):
+                    cache_data["interfaces"] = _interfaces
+                    update = True  # --> Update if interfaces reported in snapshot differ from cache
+            elif _adapters == 200:
+                log.show(
+                    f"Remote {remote_host} is reachable via {rem_ip},"
+                    " but has no adapters attached\nit's still available in remote shell menu"
+                )
 
-                # remote was reachable update last_ip, even if returned bad status_code still reachable
-                if not cache_data.get("last_ip", "") == _ip:
-                    cache_data["last_ip"] = _ip
-                    update = True  # --> Update if last_ip is different than currently reachable IP
-                break
+            # remote was reachable update last_ip, even if returned bad status_code still reachable
+            if not cache_data.get("last_ip", "") == rem_ip:
+                cache_data["last_ip"] = rem_ip
+                update = True  # --> Update if last_ip is different than currently reachable IP
 
         if cache_data.get("rem_ip") != rem_ip:
             cache_data["rem_ip"] = rem_ip
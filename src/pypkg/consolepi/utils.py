@@ -10,6 +10,7 @@ import os
 import sys
 import stat
 import grp
+import hashlib
 import json
 import threading
 import socket
@@ -409,6 +410,17 @@ class Utils:
             #     _perms += stat.S_IROTH
             os.chmod(file, (_perms))
 
+    def content_hash(self, data) -> str:
+        '''Return hash of data, udev time_since_init is excluded as it changes on every refresh.
+
+        Used wherever local data is compared (api ETags/generations, local hash for mdns/cloud publish).
+        '''
+        if isinstance(data, dict) and 'udev' in data:
+            data = {**data, 'udev': {k: v for k, v in (data['udev'] or {}).items() if k != 'time_since_init'}}
+        elif isinstance(data, dict):
+            data = {k: self.content_hash(v) if isinstance(v, dict) else v for k, v in data.items()}
+        return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('UTF-8')).hexdigest()
+
     def json_print(self, obj):
         print(json.dumps(obj, indent=4, sort_keys=True))
 
@@ -0,0 +1,211 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+import ctypes
+import ctypes.util
+import os
+import select
+import socket
+import struct
+import threading
+import time
+
+from consolepi import log  # type: ignore
+
+# -- inotify (linux) --
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+IN_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len (followed by len bytes of name)
+
+# -- rtnetlink (linux) --
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+
+
+class FileWatcher:
+    '''Call callback when any of the watched files are written, created, replaced or deleted.
+
+    Uses inotify (via ctypes, no additional dependency).  The parent directory of each file is watched so
+    files that are replaced (editors, atomic writes) or do not exist yet are still tracked.  Events are
+    coalesced, callback is called once per burst with the set of paths that changed.
+    '''
+
+    def __init__(self, files: list, callback, name: str = 'file_watcher', delay: float = 0.05):
+        self.files = [os.path.abspath(f) for f in files]
+        self.callback = callback
+        self.name = name
+        self.delay = delay  # wait this long after an event to let the writer finish (coalesce bursts)
+        self._fd = None
+        self._wds = {}  # watch descriptor: dir
+        self._thread = None
+
+    def start(self) -> bool:
+        '''Start watcher thread.
+
+        returns:
+            bool: True if watching, False if inotify is not available
+        '''
+        if self._thread is not None:
+            return True
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+            for _dir in set(os.path.dirname(f) for f in self.files):
+                wd = libc.inotify_add_watch(fd, _dir.encode(), IN_MASK)
+                if wd < 0:
+                    os.close(fd)
+                    raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {_dir}')
+                self._wds[wd] = _dir
+        except (OSError, AttributeError) as e:
+            log.warning(f'[WATCH] {self.name} inotify not available\n\t{e}')
+            return False
+
+        self._fd = fd
+        self._thread = threading.Thread(target=self._watch, name=self.name, daemon=True)
+        self._thread.start()
+        return True
+
+    def _read_events(self):
+        try:
+            buf = os.read(self._fd, 8192)
+        except BlockingIOError:
+            return set()
+
+        paths = set()
+        i = 0
+        while i + IN_EVENT.size <= len(buf):
+            wd, _, _, _len = IN_EVENT.unpack_from(buf, i)
+            name = buf[i + IN_EVENT.size:i + IN_EVENT.size + _len].rstrip(b'\0').decode(errors='replace')
+            path = os.path.join(self._wds.get(wd, ''), name)
+            if path in self.files:
+                paths.add(path)
+            i += IN_EVENT.size + _len
+        return paths
+
+    def _watch(self):
+        while True:
+            select.select([self._fd], [], [])
+            paths = self._read_events()
+            if paths:
+                time.sleep(self.delay)
+                while select.select([self._fd], [], [], 0)[0]:
+                    paths |= self._read_events()
+                try:
+                    self.callback(paths)
+                except Exception as e:
+                    log.error(f'[WATCH] {self.name} callback failed\n\t{e}')
+
+
+class NetlinkWatcher:
+    '''Call callback when the kernel reports a link, address or route change (rtnetlink multicast groups).
+
+    The messages themselves are not parsed, they only trigger the callback.  Notifications are coalesced,
+    callback is called (with no arguments) once per burst (i.e. link up, address added, default route added).
+    '''
+
+    def __init__(self, callback, groups: int = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE,
+                 name: str = 'netlink_watcher', delay: float = 0.25):
+        self.callback = callback
+        self.groups = groups
+        self.name = name
+        self.delay = delay  # wait this long after a notification for the rest of the burst
+        self._sock = None
+        self._thread = None
+
+    def start(self) -> bool:
+        '''Start watcher thread.
+
+        returns:
+            bool: True if watching, False if rtnetlink is not available
+        '''
+        if self._thread is not None:
+            return True
+
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            sock.bind((0, self.groups))
+            sock.setblocking(False)
+        except (OSError, AttributeError) as e:
+            log.warning(f'[WATCH] {self.name} rtnetlink not available\n\t{e}')
+            return False
+
+        self._sock = sock
+        self._thread = threading.Thread(target=self._watch, name=self.name, daemon=True)
+        self._thread.start()
+        return True
+
+    def _drain(self):
+        while True:
+            try:
+                self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            except OSError:  # ENOBUFS notifications were dropped, callback re-reads state so nothing is lost
+                pass
+
+    def _watch(self):
+        while True:
+            select.select([self._sock], [], [])
+            self._drain()
+            time.sleep(self.delay)
+            self._drain()
+            try:
+                self.callback()
+            except Exception as e:
+                log.error(f'[WATCH] {self.name} callback failed\n\t{e}')
+
+
+class Debouncer:
+    '''Coalesce bursts of triggers (i.e. hotplug events) into a single call of func.
+
+    func is called (with the list of reasons collected during the burst) once no trigger has arrived for
+    quiet seconds, or max_delay seconds after the first trigger of the burst if they keep arriving.
+    Triggers that arrive while func is running start a new burst, so no change is lost.
+    '''
+
+    def __init__(self, func, quiet: float, max_delay: float, name: str = 'debouncer'):
+        self.func = func
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.name = name
+        self._cond = threading.Condition()
+        self._first = None  # monotonic time of the first trigger of the current burst
+        self._last = None  # monotonic time of the most recent trigger
+        self._reasons = []
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def trigger(self, reason=None):
+        with self._cond:
+            now = time.monotonic()
+            if self._first is None:
+                self._first = now
+            self._last = now
+            if reason is not None:
+                self._reasons.append(reason)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._first is None:
+                    self._cond.wait()
+                while True:
+                    wait = min(self._last + self.quiet, self._first + self.max_delay) - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                reasons, self._reasons = self._reasons, []
+                self._first = self._last = None
+            try:
+                self.func(reasons)
+            except Exception as e:
+                log.error(f'[WATCH] {self.name} failed\n\t{e}')
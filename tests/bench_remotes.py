@@ -0,0 +1,253 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+'''Fleet scale benchmark for remote ConsolePi handling.
+
+Starts N fake ConsolePi API servers (in a separate process, one asyncio loop) each listening on port 5000
+of its own loopback address (127.10.x.y, the api port is fixed in remotes.py), then drives
+Remotes.get_remote, Remotes.refresh and Remotes.update_local_cloud_file against them using a temporary
+local cloud cache and reachability file.
+
+For each phase reports wall time, peak threads, peak python memory (tracemalloc), new TCP connections
+and remotes still pending at the end of the phase.
+
+usage:
+    bench_remotes.py [--remotes 10,100,500] [--latency 0.05] [--jitter 0.02] [--adapters 4]
+                     [--fail-rate 0.0] [--workers N] [--deadline N] [--json]
+'''
+
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'pypkg'))
+sys.path.insert(1, '/etc/ConsolePi/src/pypkg')
+
+from consolepi import config, api_client  # type: ignore # NoQA
+from consolepi.remotecache import RemoteCache, RemoteCacheWatcher  # type: ignore # NoQA
+from consolepi.remotes import Remotes  # type: ignore # NoQA
+
+API_PORT = 5000
+
+
+def remote_ip(idx):
+    return f'127.10.{idx // 250}.{idx % 250 + 1}'
+
+
+def build_adapters(count, seed=0):
+    return {
+        f'/dev/ttyUSB{a}': {
+            'config': {'port': 7001 + a, 'baud': 9600, 'dbits': 8, 'parity': 'n', 'flow': 'n', 'sbits': 1,
+                       'logfile': None, 'log_ptr': '', 'cmds': [], 'line': '', 'serial': f'SN{seed:04d}{a:02d}'},
+            'udev': {'by_id': f'/dev/serial/by-id/usb-FTDI_FT232R_USB_UART_SN{seed:04d}{a:02d}-if00-port0',
+                     'id_model': 'FT232R_USB_UART', 'id_vendor': 'FTDI', 'id_serial_short': f'SN{seed:04d}{a:02d}',
+                     'id_path': f'platform-3f980000.usb-usb-0:1.{a}:1.0', 'time_since_init': '0:00:01'}
+        } for a in range(count)
+    }
+
+
+# -- // Fake API servers \\ --
+def serve(count, latency, jitter, adapters, fail_rate, ready):
+    '''Run count fake ConsolePi API servers in a single asyncio loop (runs in child process).'''
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    bodies = {}  # ip: {path: (body, etag)}
+    for idx in range(count):
+        ip = remote_ip(idx)
+        _adapters = build_adapters(adapters, seed=idx)
+        _snapshot = {
+            'hostname': f'bench-{idx:04d}',
+            'adapters': {'data': _adapters, 'generation': 1, 'updated': time.time()},
+            'interfaces': {'data': {'eth0': {'ip': ip, 'mac': f'dc:a6:32:00:{idx // 256:02x}:{idx % 256:02x}'}},
+                           'generation': 1, 'updated': time.time()}
+        }
+        bodies[ip] = {}
+        for path, data in [('/api/v1.0/adapters', {'adapters': _adapters, 'generation': 1}),
+                           ('/api/v1.0/snapshot', _snapshot)]:
+            body = json.dumps(data).encode()
+            bodies[ip][path] = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+    async def handle(reader, writer):
+        ip = writer.get_extra_info('sockname')[0]
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                path = head.decode().split()[1].split('?')[0]
+                if path not in bodies[ip]:
+                    writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n')
+                    await writer.drain()
+                    continue
+                body, etag = bodies[ip][path]
+                headers = {
+                    k.strip().lower(): v.strip() for k, _, v in
+                    [line.partition(':') for line in head.decode().split('\r\n')[1:] if line]
+                }
+                await asyncio.sleep(max(0, latency + random.uniform(-jitter, jitter)))
+                if random.random() < fail_rate:
+                    break  # drop the connection without a response
+                if headers.get('if-none-match') == etag:
+                    writer.write(f'HTTP/1.1 304 Not Modified\r\nETag: {etag}\r\nContent-Length: 0\r\n\r\n'.encode())
+                else:
+                    writer.write(
+                        f'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nETag: {etag}\r\n'
+                        f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+                    )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        servers = [await asyncio.start_server(handle, remote_ip(idx), API_PORT) for idx in range(count)]
+        ready.set()
+        await asyncio.gather(*[s.serve_forever() for s in servers])
+
+    asyncio.run(main())
+
+
+class FakeLocal:
+    hostname = 'bench-local'
+    ip_list = ['127.0.0.1']
+    data = {}
+
+    def build_local_dict(self, refresh=False):
+        return {}
+
+
+class FakeExec:
+    def wait_for_threads(self, *args, **kwargs):
+        return False
+
+
+class PhaseStats:
+    '''Context manager collecting wall time, peak threads and peak memory for a benchmark phase.'''
+
+    def __init__(self, name):
+        self.name = name
+        self.peak_threads = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_threads = max(self.peak_threads, threading.active_count() - 1)  # exclude sampler
+            time.sleep(0.002)
+
+    def __enter__(self):
+        self._conns = api_client.stats()['connections']
+        tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self._start
+        self.peak_mem = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._stop.set()
+        self._sampler.join()
+        self.connections = api_client.stats()['connections'] - self._conns
+
+
+def run(count, args):
+    tmp_dir = tempfile.mkdtemp(prefix='cpi_bench_')
+    config.cfg['cloud'] = False
+    config.static['REACHABILITY_FILE'] = os.path.join(tmp_dir, 'reachability.json')
+    config.cloud_cache = RemoteCache(os.path.join(tmp_dir, 'cloud.db'))
+    config.cache_watcher = RemoteCacheWatcher(config.cloud_cache)
+    config.remote_update = config.cache_watcher.get
+    if args.workers:
+        config.remote_verify_workers = args.workers
+    if args.deadline:
+        config.remote_verify_deadline = args.deadline
+
+    now = time.time()
+    seed = {
+        f'bench-{idx:04d}': {
+            'rem_ip': remote_ip(idx), 'source': 'bench', 'upd_time': int(now), 'user': 'pi',
+            'interfaces': {'eth0': {'ip': remote_ip(idx), 'mac': f'dc:a6:32:00:{idx // 256:02x}:{idx % 256:02x}'}},
+            'adapters': build_adapters(args.adapters, seed=idx)
+        } for idx in range(count)
+    }
+    config.cloud_cache.upsert(seed)
+    config.remotes = config.get_remotes_from_file()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve, args=(count, args.latency, args.jitter, args.adapters, args.fail_rate, ready), daemon=True
+    )
+    server.start()
+    if not ready.wait(30):
+        server.terminate()
+        sys.exit(f'fake api servers failed to start ({count})')
+
+    results = []
+    try:
+        with PhaseStats('init (get_remote)') as p:
+            remotes = Remotes(FakeLocal(), FakeExec())
+        results.append((p, len(remotes.pending)))
+
+        with PhaseStats('get_remote (cached etag)') as p:
+            remotes.data = remotes.get_remote(data=config.remote_update())
+        results.append((p, len(remotes.pending)))
+
+        with PhaseStats('refresh') as p:
+            remotes.refresh(bypass_cloud=True)
+        results.append((p, len(remotes.pending)))
+
+        update = config.remote_update()
+        for r in update:
+            update[r]['upd_time'] += 1
+            update[r]['source'] = 'mdns'
+        with PhaseStats('update_local_cloud_file') as p:
+            remotes.update_local_cloud_file(update)
+        results.append((p, 0))
+    finally:
+        server.terminate()
+        server.join()
+
+    return [
+        {'remotes': count, 'phase': p.name, 'wall': round(p.wall, 3), 'peak_threads': p.peak_threads,
+         'peak_mem_mb': round(p.peak_mem / 1024 / 1024, 2), 'connections': p.connections, 'pending': pending}
+        for p, pending in results
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark remote ConsolePi handling against fake API servers')
+    parser.add_argument('--remotes', default='10,100,500', help='comma separated list of fleet sizes')
+    parser.add_argument('--latency', type=float, default=0.05, help='api response latency (secs)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='+/- random latency (secs)')
+    parser.add_argument('--adapters', type=int, default=4, help='adapters per remote (payload size)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of requests dropped (0-1)')
+    parser.add_argument('--workers', type=int, help='override remote_verify_workers')
+    parser.add_argument('--deadline', type=int, help='override remote_verify_deadline')
+    parser.add_argument('--json', action='store_true', help='output results as json')
+    args = parser.parse_args()
+
+    results = []
+    for count in [int(n) for n in args.remotes.split(',')]:
+        results += run(count, args)
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print(f'{"remotes":>7}  {"phase":<26}{"wall(s)":>8}{"threads":>9}{"mem(MB)":>9}{"conns":>7}{"pending":>9}')
+        for r in results:
+            print(f'{r["remotes"]:>7}  {r["phase"]:<26}{r["wall"]:>8}{r["peak_threads"]:>9}'
+                  f'{r["peak_mem_mb"]:>9}{r["connections"]:>7}{r["pending"]:>9}')
+        print(f'max rss: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+#!/etc/ConsolePi/venv/bin/python3
+
+'''Load test for the ConsolePi API.
+
+Simulates many ConsolePis polling a hub after an mdns event.  Unless --url is given a local instance of
+consolepi-api is started in a child process (uvicorn, 127.0.0.1) with pyudev and netifaces replaced by
+fakes, so it runs on any dev box (the ConsolePi config files are still read from /etc/ConsolePi).
+
+Each client holds a keep-alive connection (or reconnects per request with --no-keepalive) and requests
+the routes in turn until --duration expires.  Reports requests, errors, error rate, req/s and
+p50/p95/p99/max latency per route.
+
+usage:
+    load_api.py [--url http://host:5000] [--concurrency 50] [--duration 10]
+                [--routes adapters,details,interfaces,remotes] [--etag] [--no-keepalive]
+                [--adapters 8] [--udev-delay 0.0] [--no-live] [--json]
+'''
+
+import argparse
+import asyncio
+import datetime
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+import types
+from urllib.parse import urlparse
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+ROUTES = ['adapters', 'details', 'interfaces', 'remotes']
+PORT = 5099  # port for the local instance (so it does not collide with the api service)
+
+
+# -- // Fake pyudev / netifaces \\ --
+class FakeProperties(dict):
+    def __init__(self, device, *args):
+        super().__init__(*args)
+        self.device = device
+
+
+class FakeAttributes(dict):
+    @property
+    def available_attributes(self):
+        return list(self)
+
+
+class FakeDevice:
+    def __init__(self, idx, parent=None):
+        self.sys_name = f'ttyUSB{idx}'
+        self.device_node = f'/dev/{self.sys_name}'
+        self.action = None
+        self.time_since_initialized = datetime.timedelta(minutes=42)
+        self.parent = parent
+        self.ancestors = [] if parent is None else [parent]
+        self.attributes = FakeAttributes({'devpath': f'1.{idx}'.encode()})
+        serial = f'LOAD{idx:04d}'
+        self.properties = FakeProperties(self, {
+            'DEVPATH': f'/devices/platform/soc/3f980000.usb/usb1/1-1/1-1.{idx}/1-1.{idx}:1.0/{self.sys_name}/tty/{self.sys_name}',
+            'DEVNAME': self.device_node,
+            'DEVLINKS': f'/dev/serial/by-id/usb-FTDI_FT232R_USB_UART_{serial}-if00-port0 '
+                        f'/dev/serial/by-path/platform-3f980000.usb-usb-0:1.{idx}:1.0-port0',
+            'ID_BUS': 'usb',
+            'ID_MODEL': 'FT232R_USB_UART',
+            'ID_MODEL_ID': '6001',
+            'ID_VENDOR': 'FTDI',
+            'ID_VENDOR_ID': '0403',
+            'ID_SERIAL': f'FTDI_FT232R_USB_UART_{serial}',
+            'ID_SERIAL_SHORT': serial,
+            'ID_PATH': f'platform-3f980000.usb-usb-0:1.{idx}:1.0',
+            'ID_USB_INTERFACE_NUM': '00',
+            'ID_USB_DRIVER': 'ftdi_sio',
+            'SUBSYSTEM': 'tty',
+        })
+
+    def get(self, key, default=None):
+        return self.properties.get(key, default)
+
+
+def fake_pyudev(adapters: int, udev_delay: float, live: bool):
+    '''Return a module standing in for pyudev with adapters FT232R adapters attached.'''
+    devices = {f'ttyUSB{i}': FakeDevice(i) for i in range(adapters)}
+    mod = types.ModuleType('pyudev')
+
+    class DeviceNotFoundByNameError(LookupError):
+        pass
+
+    class Context:
+        def list_devices(self, **kwargs):
+            time.sleep(udev_delay)  # simulate the cost of the udev scan
+            return list(devices.values()) if kwargs.get('ID_BUS') == 'usb' else []
+
+    class Devices:
+        @staticmethod
+        def from_name(context, subsystem, name):
+            if name not in devices:
+                raise DeviceNotFoundByNameError(name)
+            return devices[name]
+
+    class Monitor:
+        @staticmethod
+        def from_netlink(context):
+            if not live:
+                raise OSError('netlink not available (load test --no-live)')
+            return Monitor()
+
+        def filter_by(self, *args, **kwargs):
+            pass
+
+    class MonitorObserver:
+        def __init__(self, monitor, callback=None, name=None):
+            pass
+
+        def start(self):
+            pass
+
+    mod.Context, mod.Devices, mod.Monitor, mod.MonitorObserver = Context, Devices, Monitor, MonitorObserver
+    mod._errors = types.SimpleNamespace(DeviceNotFoundByNameError=DeviceNotFoundByNameError)
+    return mod
+
+
+def fake_netifaces():
+    mod = types.ModuleType('netifaces')
+    mod.AF_LINK, mod.AF_INET = 17, 2
+    _ifaces = {
+        'eth0': {2: [{'addr': '10.0.30.10'}], 17: [{'addr': 'dc:a6:32:00:00:01'}]},
+        'wlan0': {2: [{'addr': '10.3.0.1'}], 17: [{'addr': 'dc:a6:32:00:00:02'}]},
+        'lo': {2: [{'addr': '127.0.0.1'}], 17: [{'addr': '00:00:00:00:00:00'}]},
+    }
+    mod.interfaces = lambda: list(_ifaces)
+    mod.ifaddresses = lambda iface: _ifaces[iface]
+    mod.gateways = lambda: {'default': {2: ('10.0.30.1', 'eth0')}}
+    return mod
+
+
+def serve(args, ready):
+    '''Run consolepi-api with faked pyudev/netifaces (runs in child process).'''
+    sys.modules['pyudev'] = fake_pyudev(args.adapters, args.udev_delay, not args.no_live)
+    sys.modules['netifaces'] = fake_netifaces()
+    sys.path.insert(0, os.path.join(SRC_DIR, 'pypkg'))
+    from consolepi import config as cpi_config  # type: ignore
+    cpi_config.api_fast_start = True  # only Local is built, power (RPi.GPIO etc.) is not needed to load test the api
+    spec = importlib.util.spec_from_file_location('consolepi_api', os.path.join(SRC_DIR, 'consolepi-api.py'))
+    api = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(api)
+
+    import uvicorn
+    config = uvicorn.Config(api.app, host='127.0.0.1', port=PORT, log_level='warning',
+                            timeout_keep_alive=api.KEEP_ALIVE)
+    server = uvicorn.Server(config)
+
+    async def main():
+        task = asyncio.ensure_future(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        ready.set()
+        await task
+
+    asyncio.run(main())
+
+
+# -- // Load generator \\ --
+async def read_response(reader) -> tuple:
+    '''Read a HTTP/1.1 response, returns (status, headers, body).'''
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode().split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in [line.partition(':') for line in lines[1:] if line]}
+    if headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            body += (await reader.readexactly(size + 2))[:-2]
+            if not size:
+                break
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, body
+
+
+async def client(host, port, routes, deadline, args, results, offset):
+    reader = writer = None
+    etags = {}
+    i = offset
+    while time.perf_counter() < deadline:
+        route = routes[i % len(routes)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            _headers = f'GET /api/v1.0/{route} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: application/json\r\n'
+            if args.etag and route in etags:
+                _headers += f'If-None-Match: {etags[route]}\r\n'
+            if args.no_keepalive:
+                _headers += 'Connection: close\r\n'
+            writer.write(f'{_headers}\r\n'.encode())
+            await writer.drain()
+            status, headers, _ = await asyncio.wait_for(read_response(reader), args.timeout)
+            if 'etag' in headers:
+                etags[route] = headers['etag']
+            err = None if status < 400 else f'http {status}'
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError) as e:
+            err = type(e).__name__
+        results.append((route, time.perf_counter() - start, err))
+        if err or args.no_keepalive:
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+def percentile(values: list, pct: float) -> float:
+    '''Nearest-rank percentile of sorted values.'''
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summarize(results: list, routes: list, wall: float) -> list:
+    summary = []
+    for route in routes + ['all']:
+        _this = [r for r in results if route in ['all', r[0]]]
+        lat = sorted(r[1] for r in _this if not r[2])
+        errors = len([r for r in _this if r[2]])
+        summary.append({
+            'route': route, 'requests': len(_this), 'errors': errors,
+            'error_rate': round(errors / len(_this), 4) if _this else 0.0,
+            'rps': round(len(_this) / wall, 1),
+            **{f'p{p}_ms': round(percentile(lat, p) * 1000, 2) for p in [50, 95, 99]},
+            'max_ms': round(max(lat, default=0) * 1000, 2),
+            'error_types': sorted(set(r[2] for r in _this if r[2])),
+        })
+    return summary
+
+
+async def run(host, port, routes, args):
+    results = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    # clients start on different routes so every route sees the full concurrency at once (as after an mdns event)
+    await asyncio.gather(*[client(host, port, routes, deadline, args, results, c) for c in range(args.concurrency)])
+    return summarize(results, routes, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the ConsolePi API')
+    parser.add_argument('--url', help='target a running api (default: start a local instance with fake udev/netifaces)')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent clients (polling ConsolePis)')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to run')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='comma separated api routes to request')
+    parser.add_argument('--etag', action='store_true', help='send If-None-Match with the ETag from the last response')
+    parser.add_argument('--no-keepalive', action='store_true', help='open a new connection for every request')
+    parser.add_argument('--timeout', type=float, default=30, help='request timeout (secs), counted as an error')
+    parser.add_argument('--adapters', type=int, default=8, help='fake adapters attached (local instance)')
+    parser.add_argument('--udev-delay', type=float, default=0.0, help='added latency of each fake udev scan (secs)')
+    parser.add_argument('--no-live', action='store_true',
+                        help='fail the fake udev monitor so the api uses the 20 second refresh logic (local instance)')
+    parser.add_argument('--json', action='store_true', help='output results as json')
+    args = parser.parse_args()
+    routes = [r.strip().strip('/') for r in args.routes.split(',') if r.strip()]
+
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', PORT
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=serve, args=(args, ready), daemon=True)
+        server.start()
+        if not ready.wait(60):
+            server.terminate()
+            sys.exit('local consolepi-api failed to start')
+
+    try:
+        summary = asyncio.run(run(host, port, routes, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        print(f'{"route":<12}{"rqsts":>8}{"errors":>8}{"err %":>8}{"req/s":>9}'
+              f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+        for r in summary:
+            print(f'{r["route"]:<12}{r["requests"]:>8}{r["errors"]:>8}{r["error_rate"] * 100:>8.2f}{r["rps"]:>9}'
+                  f'{r["p50_ms"]:>9}{r["p95_ms"]:>9}{r["p99_ms"]:>9}{r["max_ms"]:>9}'
+                  + ('' if not r['error_types'] else f'  {", ".join(r["error_types"])}'))
+
+
+if __name__ == '__main__':
+    main()